@@ -0,0 +1,242 @@
+"""Seeded benchmarks for the simulation hot paths.
+
+Each benchmark builds a scripted scenario from a fixed seed, runs a number
+of ticks and times only the subsystem under test. Work done to keep the
+scenario steady, such as aiming, firing or topping up particles, happens
+outside the timed region. Results are reported as ticks per second and
+per-tick latency percentiles.
+
+    python benchmark.py                          # run everything
+    python benchmark.py --only particles         # names containing "particles"
+    python benchmark.py --save baseline.json     # record a baseline
+    python benchmark.py --baseline baseline.json --threshold 0.15
+
+With --baseline, the run exits nonzero if any benchmark's ticks per second
+fall, or its p95 latency rises, by more than the threshold.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import numpy as np
+from enemy import Enemy
+from particle_system import ParticleSystem
+from projectile import OWNER_PLAYER, TYPE_ENEMY, TYPE_PLAYER, ProjectileStore
+from scenarios import aim_at, build_arena
+
+DT = 1 / 60
+
+def enemy_scenario(enemy_count, seed):
+    """EnemyManager.update with `enemy_count` enemies under steady fire"""
+    projectiles, player, manager = build_arena(enemy_count, seed)
+    player.shot_cooldown = 0
+    manager.spawn_interval = 0  # Replace destroyed enemies straight away
+    clock = [0.0]
+
+    def prepare():
+        clock[0] += DT
+        if manager.enemies:
+            enemy = random.choice(manager.enemies)
+            part = random.choice(enemy.parts)
+            aim_at(player, [enemy.pos[i] + part.relative_pos[i] + random.uniform(-0.4, 0.4)
+                            for i in range(3)])
+            player.shoot(clock[0])
+
+    def step():
+        manager.update(DT, clock[0], player)
+        manager.cleanup()
+
+    return prepare, step
+
+def projectile_scenario(projectile_count, seed):
+    """EnemyManager.update with `projectile_count` projectiles in flight around 5 enemies"""
+    projectiles, player, manager = build_arena(5, seed)
+    manager.spawn_interval = math.inf
+    for enemy in manager.enemies:
+        enemy.shot_cooldown = math.inf  # Only the scripted projectiles fly
+        for part in enemy.parts:
+            part.health = part.max_health = 1e9  # Keep the targets intact
+    clock = [0.0]
+
+    def prepare():
+        clock[0] += DT
+        # Top the population back up with shots crossing the arena
+        for _ in range(projectile_count - len(projectiles)):
+            angle = random.uniform(0, 2 * math.pi)
+            distance = random.uniform(0, 25)
+            origin = [distance * math.cos(angle), random.uniform(-1, 2), distance * math.sin(angle)]
+            direction = [random.uniform(-1, 1), random.uniform(-0.1, 0.1), random.uniform(-1, 1)]
+            if random.random() < 0.8:
+                projectiles.spawn(origin, direction, TYPE_PLAYER, OWNER_PLAYER)
+            else:
+                projectiles.spawn(origin, direction, TYPE_ENEMY, random.choice(manager.enemies).id)
+
+    def step():
+        manager.update(DT, clock[0], player)
+
+    return prepare, step
+
+def particle_scenario(particle_count, seed):
+    """ParticleSystem.update holding `particle_count` live particles"""
+    rng = np.random.default_rng(seed)
+    particles = ParticleSystem(rng=rng, capacity=particle_count)
+
+    def prepare():
+        missing = particle_count - particles.count
+        if missing > 0:
+            particles.emit_explosion(rng.uniform(-20, 20, size=3), count=missing)
+
+    def step():
+        particles.update(DT)
+
+    return prepare, step
+
+def collision_scenario(projectile_count, seed):
+    """EnemyPart.check_collision of every projectile against every part of one enemy"""
+    random.seed(seed)
+    projectiles = ProjectileStore()
+    enemy = Enemy([0, 0, 0], projectiles, 0)
+    for _ in range(projectile_count):
+        # Start around the enemy, flying roughly at it so some paths connect
+        origin = [random.uniform(-3, 3) for _ in range(3)]
+        projectiles.spawn(origin, [random.uniform(-0.5, 0.5) - c for c in origin], TYPE_PLAYER, OWNER_PLAYER)
+    projectiles.update(DT)
+    handles = [projectiles.get(i) for i in range(len(projectiles))]
+
+    def step():
+        for projectile in handles:
+            for part in enemy.parts:
+                part.check_collision(projectile, enemy.pos)
+
+    return None, step
+
+def impact_scenario(projectile_count, seed):
+    """Projectile.calculate_impact for `projectile_count` hits"""
+    random.seed(seed)
+    projectiles = ProjectileStore()
+    for _ in range(projectile_count):
+        projectiles.spawn([0, 0, 0], [random.uniform(-1, 1) for _ in range(3)], TYPE_PLAYER, OWNER_PLAYER)
+    handles = [projectiles.get(i) for i in range(len(projectiles))]
+    normals = [[random.uniform(-1, 1) for _ in range(3)] for _ in handles]
+    materials = [random.choice(["metal", "shield", "core", "engine"]) for _ in handles]
+
+    def step():
+        for projectile, normal, material in zip(handles, normals, materials):
+            projectile.calculate_impact([0, 0, 0], normal, material)
+
+    return None, step
+
+# (name, scenario, size)
+BENCHMARKS = [
+    ("enemies/5", enemy_scenario, 5),
+    ("enemies/50", enemy_scenario, 50),
+    ("enemies/500", enemy_scenario, 500),
+    ("projectiles/100", projectile_scenario, 100),
+    ("projectiles/1000", projectile_scenario, 1000),
+    ("projectiles/10000", projectile_scenario, 10000),
+    ("particles/1000", particle_scenario, 1000),
+    ("particles/10000", particle_scenario, 10000),
+    ("particles/100000", particle_scenario, 100000),
+    ("check_collision/1000", collision_scenario, 1000),
+    ("calculate_impact/1000", impact_scenario, 1000),
+]
+
+def percentile(samples, q):
+    return float(np.percentile(samples, q))
+
+def run_benchmark(scenario, size, seed, ticks, warmup):
+    """Time `ticks` steps of a scenario after `warmup` untimed ones"""
+    prepare, step = scenario(size, seed)
+    samples = []
+    for tick in range(warmup + ticks):
+        if prepare is not None:
+            prepare()
+        start = time.perf_counter()
+        step()
+        elapsed = time.perf_counter() - start
+        if tick >= warmup:
+            samples.append(elapsed)
+    samples = np.array(samples) * 1000  # ms
+    return {
+        "ticks_per_sec": float(1000 / samples.mean()),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+def compare(results, baseline, threshold):
+    """(name, reason) for each benchmark that regressed by more than `threshold`"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["ticks_per_sec"] < expected["ticks_per_sec"] * (1 - threshold):
+            regressions.append((name, f"ticks/s {expected['ticks_per_sec']:.1f} -> {result['ticks_per_sec']:.1f}"))
+        elif result["p95_ms"] > expected["p95_ms"] * (1 + threshold):
+            regressions.append((name, f"p95 {expected['p95_ms']:.3f} ms -> {result['p95_ms']:.3f} ms"))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths")
+    parser.add_argument("--ticks", type=int, default=200, help="Timed ticks per benchmark")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed ticks before timing starts")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for every scenario")
+    parser.add_argument("--only", default=None, help="Run benchmarks whose name contains this")
+    parser.add_argument("--save", default=None, help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed fractional slowdown before a benchmark counts as regressed")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read baseline {args.baseline}: {e}")
+            sys.exit(2)
+
+    results = {}
+    print(f"{'benchmark':<24}{'ticks/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'vs base':>10}")
+    for name, scenario, size in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        result = run_benchmark(scenario, size, args.seed, args.ticks, args.warmup)
+        results[name] = result
+        change = ""
+        if name in baseline:
+            change = f"{result['ticks_per_sec'] / baseline[name]['ticks_per_sec'] - 1:+.1%}"
+        print(f"{name:<24}{result['ticks_per_sec']:>10.1f}{result['p50_ms']:>10.3f}"
+              f"{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}{change:>10}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "ticks": args.ticks,
+                    "warmup": args.warmup,
+                    "seed": args.seed,
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, reason in regressions:
+            print(f"REGRESSION: {name}: {reason} (threshold {args.threshold:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import math
+import numpy as np
+
+AXIS_NORMALS = np.eye(3)
+
+# Iterations of the closest-approach and first-contact searches used when a
+# swept sphere meets a box near an edge or corner
+CONTACT_ITERATIONS = 32
+GOLDEN = (3 - math.sqrt(5)) / 2
+
+def _box_gap(p0, d, radius, lower, upper, t):
+    """Distance between the moving sphere at time t and the box, minus its radius"""
+    center = p0 + t[:, None] * d
+    offset = center - np.clip(center, lower, upper)
+    return np.sqrt(np.sum(offset * offset, axis=1)) - radius
+
+def _first_box_contact(p0, d, radius, lower, upper, t_lo, t_hi):
+    """First t in [t_lo, t_hi] where spheres moving p0 + t*d touch their boxes.
+
+    The sphere-to-box distance is convex along a straight path, so a golden
+    section search finds the closest approach and a bisection before it finds
+    the first contact. Returns NaN for pairs that never touch.
+    """
+    a, b = t_lo.copy(), t_hi.copy()
+    for _ in range(CONTACT_ITERATIONS):
+        m1 = a + (b - a) * GOLDEN
+        m2 = b - (b - a) * GOLDEN
+        closer_left = _box_gap(p0, d, radius, lower, upper, m1) < _box_gap(p0, d, radius, lower, upper, m2)
+        b = np.where(closer_left, m2, b)
+        a = np.where(closer_left, a, m1)
+    t_closest = (a + b) / 2
+
+    a, b = t_lo.copy(), t_closest.copy()
+    for _ in range(CONTACT_ITERATIONS):
+        mid = (a + b) / 2
+        touching = _box_gap(p0, d, radius, lower, upper, mid) <= 0
+        b = np.where(touching, mid, b)
+        a = np.where(touching, a, mid)
+
+    t = np.where(_box_gap(p0, d, radius, lower, upper, t_lo) <= 0, t_lo, b)
+    return np.where(_box_gap(p0, d, radius, lower, upper, t) <= 0, t, np.nan)
+
+def _contact(p0, d, t, lower, upper, face_normal):
+    """Hit point on the box surface and contact normal for spheres at time t"""
+    center = p0 + t[:, None] * d
+    hit_points = np.clip(center, lower, upper)
+    offset = center - hit_points
+    length = np.sqrt(np.sum(offset * offset, axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normals = np.where(length[:, None] > 0, offset / length[:, None], face_normal)
+    return hit_points, normals
+
+def segment_box_hit(start, end, radius, center, box_min, box_max):
+    """Swept-sphere test of a sphere moving start->end against one box.
+
+    The box spans center + box_min to center + box_max. A slab test against
+    the box grown by `radius` finds where the sphere enters; if that entry is
+    beside an edge or corner rather than a face, the exact first contact
+    with the rounded corner is searched for. Returns (t, hit point, normal),
+    t being the fraction of the path travelled and the hit point lying on the
+    box surface, or None on a miss. A sphere that starts touching the box
+    hits at t = 0.
+    """
+    t_enter = -math.inf
+    t_exit = math.inf
+    axis = -1
+    for i in range(3):
+        lower = (center[i] + box_min[i]) - radius
+        upper = (center[i] + box_max[i]) + radius
+        d = end[i] - start[i]
+        if d == 0:
+            # Parallel to this slab: must already lie within it
+            if start[i] < lower or start[i] > upper:
+                return None
+            continue
+        t1 = (lower - start[i]) / d
+        t2 = (upper - start[i]) / d
+        t_near = t1 if t1 < t2 else t2
+        t_far = t2 if t1 < t2 else t1
+        if t_near > t_enter:
+            t_enter = t_near
+            axis = i
+        if t_far < t_exit:
+            t_exit = t_far
+
+    if t_enter > t_exit or t_exit < 0 or t_enter > 1:
+        return None
+
+    t = t_enter if t_enter > 0 else 0.0
+    normal = [0, 0, 0]
+    if axis < 0:
+        normal[1] = 1  # Zero-length path resting inside the box
+    else:
+        normal[axis] = -1 if end[axis] - start[axis] > 0 else 1
+
+    position = [start[i] + t * (end[i] - start[i]) for i in range(3)]
+    box_lower = [center[i] + box_min[i] for i in range(3)]
+    box_upper = [center[i] + box_max[i] for i in range(3)]
+    outside = sum(1 for i in range(3) if position[i] < box_lower[i] or position[i] > box_upper[i])
+    if outside < 2:
+        # Entered through a face
+        hit_point = [min(max(position[i], box_lower[i]), box_upper[i]) for i in range(3)]
+        return t, hit_point, normal
+
+    # Entered the grown box beside an edge or corner: find the real contact
+    p0 = np.array([start], dtype=np.float64)
+    d = np.array([[end[i] - start[i] for i in range(3)]], dtype=np.float64)
+    lower = np.array([box_lower])
+    upper = np.array([box_upper])
+    contact_t = _first_box_contact(p0, d, radius, lower, upper,
+                                   np.array([t]), np.array([t_exit if t_exit < 1 else 1.0]))
+    if np.isnan(contact_t[0]):
+        return None
+    hit_points, normals = _contact(p0, d, contact_t, lower, upper, np.array([normal], dtype=np.float64))
+    return float(contact_t[0]), hit_points[0].tolist(), normals[0].tolist()
+
+def segment_box_hits(start, end, radius, box_min, box_max, pairs=None):
+    """Swept-sphere test of many projectiles against many boxes at once.
+
+    start/end are the (P, 3) positions of each projectile before and after
+    this frame's move and radius its (P,) radius; box_min/box_max are the
+    (M, 3) world-space corners of each box. `pairs` can restrict the test to
+    given (projectile indices, box indices), e.g. from a broadphase; by
+    default all P x M pairs are tested. Same maths as segment_box_hit.
+    Returns (projectile indices, box indices, t, hit points, contact
+    normals) for every pair that touches.
+    """
+    if pairs is None:
+        proj_idx, box_idx = np.divmod(np.arange(len(start) * len(box_min)), len(box_min))
+    else:
+        proj_idx, box_idx = pairs
+    p0 = start[proj_idx]
+    d = end[proj_idx] - p0
+    r = radius[proj_idx]
+    box_lower = box_min[box_idx]
+    box_upper = box_max[box_idx]
+    lower = box_lower - r[:, None]
+    upper = box_upper + r[:, None]
+
+    parallel = d == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (lower - p0) / d
+        t2 = (upper - p0) / d
+    t_near = np.where(parallel, -np.inf, np.where(t1 < t2, t1, t2))
+    t_far = np.where(parallel, np.inf, np.where(t1 < t2, t2, t1))
+    outside = np.any(parallel & ((p0 < lower) | (p0 > upper)), axis=1)
+
+    # argmax keeps the first axis on ties, like the strict > in the scalar test
+    axis = np.argmax(t_near, axis=1)
+    rows = np.arange(len(axis))
+    t_enter = t_near[rows, axis]
+    t_exit = np.min(t_far, axis=1)
+    hit = ~outside & ~(t_enter > t_exit) & ~(t_exit < 0) & ~(t_enter > 1)
+
+    p0, d, r, axis, t_enter, t_exit = p0[hit], d[hit], r[hit], axis[hit], t_enter[hit], t_exit[hit]
+    box_lower, box_upper = box_lower[hit], box_upper[hit]
+    proj_idx, box_idx = proj_idx[hit], box_idx[hit]
+    rows = np.arange(len(axis))
+
+    t = np.maximum(t_enter, 0.0)
+    normals = AXIS_NORMALS[axis] * np.where(d[rows, axis] > 0, -1.0, 1.0)[:, None]
+    # Zero-length paths resting inside a box report an upward normal
+    normals[np.isneginf(t_enter)] = (0, 1, 0)
+
+    # Entries beside an edge or corner need the exact rounded-corner contact
+    position = p0 + t[:, None] * d
+    corner = np.sum((position < box_lower) | (position > box_upper), axis=1) >= 2
+    if corner.any():
+        contact_t = _first_box_contact(p0[corner], d[corner], r[corner], box_lower[corner], box_upper[corner],
+                                       t[corner], np.minimum(t_exit[corner], 1.0))
+        t[corner] = contact_t
+        _, normals[corner] = _contact(p0[corner], d[corner], np.nan_to_num(contact_t),
+                                      box_lower[corner], box_upper[corner], normals[corner])
+        touched = ~np.isnan(t)
+        proj_idx, box_idx, t, p0, d, normals = (proj_idx[touched], box_idx[touched], t[touched],
+                                                p0[touched], d[touched], normals[touched])
+        box_lower, box_upper = box_lower[touched], box_upper[touched]
+
+    hit_points = np.clip(p0 + t[:, None] * d, box_lower, box_upper)
+    return proj_idx, box_idx, t, hit_points, normals
+
+def segment_sphere_hit(start, end, radius, center, sphere_radius):
+    """First t in [0, 1] at which a sphere moving start->end touches a sphere.
+
+    Returns None if the two never come closer than the sum of their radii.
+    """
+    reach = sphere_radius + radius
+    d = [end[i] - start[i] for i in range(3)]
+    m = [start[i] - center[i] for i in range(3)]
+    c = m[0]*m[0] + m[1]*m[1] + m[2]*m[2] - reach*reach
+    if c < 0:
+        return 0.0  # Already overlapping at the start of the move
+    a = d[0]*d[0] + d[1]*d[1] + d[2]*d[2]
+    b = m[0]*d[0] + m[1]*d[1] + m[2]*d[2]
+    if a == 0 or b > 0:
+        return None  # Not moving, or moving away
+    discriminant = b*b - a*c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / a
+    return t if t <= 1 else None
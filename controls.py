@@ -0,0 +1,25 @@
+class InputState:
+    """One tick's worth of player input"""
+    def __init__(self, mouse_buttons=(False, False, False), mouse_rel=(0, 0), move_x=0, move_z=0):
+        self.mouse_buttons = mouse_buttons  # left, middle, right
+        self.mouse_rel = mouse_rel  # Mouse movement since the last tick
+        self.move_x = move_x  # -1 left, 1 right
+        self.move_z = move_z  # -1 forward, 1 backward
+
+class ScriptedInput:
+    """Input source that replays a script instead of reading devices.
+
+    `script` is called with the tick number and the game state and returns an
+    InputState; without one the player stands still and holds fire.
+    """
+    def __init__(self, script=None):
+        self.script = script
+        self.tick = 0
+
+    def poll(self, game_state):
+        if self.script is None:
+            controls = InputState(mouse_buttons=(True, False, False))
+        else:
+            controls = self.script(self.tick, game_state)
+        self.tick += 1
+        return controls
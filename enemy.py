@@ -1,8 +1,10 @@
 import random
-from OpenGL.GL import *
 import numpy as np
 import math
-from projectile import EnemyProjectile
+from collision import segment_box_hit, segment_box_hits
+from projectile import TYPE_ENEMY, TYPE_PLAYER, ProjectileStore
+from spatial_hash import SpatialHash, concat_ranges
+from tracing import tracer
 
 class EnemyPart:
     def __init__(self, relative_pos, size, health, color, name, material_type="metal"):
@@ -15,16 +17,10 @@ class EnemyPart:
         self.alive = True
         self.material_type = material_type
         
-        # Define faces for hit detection (normal vectors pointing outward)
-        self.faces = [
-            {"normal": [0, 0, 1], "vertices": []},   # Front
-            {"normal": [0, 0, -1], "vertices": []},  # Back
-            {"normal": [0, 1, 0], "vertices": []},   # Top
-            {"normal": [0, -1, 0], "vertices": []},  # Bottom
-            {"normal": [1, 0, 0], "vertices": []},   # Right
-            {"normal": [-1, 0, 0], "vertices": []}   # Left
-        ]
-        self._calculate_face_vertices()
+        # Axis-aligned bounds relative to the enemy center, used for hit detection
+        s = self.size / 2
+        self.box_min = [c - s for c in self.relative_pos]
+        self.box_max = [c + s for c in self.relative_pos]
         
         # Damage resistance properties
         self.armor_rating = {
@@ -35,167 +31,23 @@ class EnemyPart:
             "engine": 0.7
         }.get(name, 1.0)
 
-    def _calculate_face_vertices(self):
-        """Calculate vertices for each face based on size"""
-        s = self.size / 2
-        
-        # Front face vertices (clockwise order)
-        self.faces[0]["vertices"] = [
-            [-s, -s, s], [s, -s, s],
-            [s, s, s], [-s, s, s]
-        ]
-        
-        # Back face vertices
-        self.faces[1]["vertices"] = [
-            [-s, -s, -s], [-s, s, -s],
-            [s, s, -s], [s, -s, -s]
-        ]
-        
-        # Top face vertices
-        self.faces[2]["vertices"] = [
-            [-s, s, -s], [-s, s, s],
-            [s, s, s], [s, s, -s]
-        ]
-        
-        # Bottom face vertices
-        self.faces[3]["vertices"] = [
-            [-s, -s, -s], [s, -s, -s],
-            [s, -s, s], [-s, -s, s]
-        ]
-        
-        # Right face vertices
-        self.faces[4]["vertices"] = [
-            [s, -s, -s], [s, s, -s],
-            [s, s, s], [s, -s, s]
-        ]
-        
-        # Left face vertices
-        self.faces[5]["vertices"] = [
-            [-s, -s, -s], [-s, -s, s],
-            [-s, s, s], [-s, s, -s]
-        ]
-
-    def get_world_vertices(self, enemy_pos):
-        """Get vertices in world space"""
-        world_vertices = []
-        for face in self.faces:
-            face_verts = []
-            for vertex in face["vertices"]:
-                world_vert = [
-                    enemy_pos[0] + self.relative_pos[0] + vertex[0],
-                    enemy_pos[1] + self.relative_pos[1] + vertex[1],
-                    enemy_pos[2] + self.relative_pos[2] + vertex[2]
-                ]
-                face_verts.append(world_vert)
-            world_vertices.append(face_verts)
-        return world_vertices
-
     def check_collision(self, projectile, enemy_pos):
-        """Check if projectile hits this part and calculate impact"""
+        """Check if the projectile's path this frame enters this part"""
         if not self.alive:
             return False, None
             
-        # Simple sphere-box collision first for performance
-        part_pos = [
-            enemy_pos[0] + self.relative_pos[0],
-            enemy_pos[1] + self.relative_pos[1],
-            enemy_pos[2] + self.relative_pos[2]
-        ]
-        
-        dx = part_pos[0] - projectile.pos[0]
-        dy = part_pos[1] - projectile.pos[1]
-        dz = part_pos[2] - projectile.pos[2]
-        distance = np.sqrt(dx*dx + dy*dy + dz*dz)
-        
-        if distance > (self.size + projectile.radius):
+        hit = segment_box_hit(projectile.prev_pos, projectile.pos, projectile.radius,
+                              enemy_pos, self.box_min, self.box_max)
+        if hit is None:
             return False, None
             
-        # If we're here, we need to do detailed collision detection
-        # Find the closest face and its normal
-        closest_face = None
-        closest_dist = float('inf')
-        hit_point = None
-        
-        for face_idx, face in enumerate(self.faces):
-            # Transform face normal to world space (simplified - assumes no rotation)
-            world_normal = face["normal"]
-            
-            # Get face vertices in world space
-            world_vertices = []
-            for vertex in face["vertices"]:
-                world_vertices.append([
-                    part_pos[0] + vertex[0],
-                    part_pos[1] + vertex[1],
-                    part_pos[2] + vertex[2]
-                ])
-            
-            # Calculate distance from projectile to face plane
-            face_point = world_vertices[0]  # Any vertex will do for plane calculation
-            
-            # Vector from face to projectile
-            to_projectile = [
-                projectile.pos[0] - face_point[0],
-                projectile.pos[1] - face_point[1],
-                projectile.pos[2] - face_point[2]
-            ]
-            
-            # Distance to plane
-            dist = sum(a*b for a, b in zip(to_projectile, world_normal))
-            
-            if abs(dist) < closest_dist and abs(dist) <= projectile.radius:
-                # Calculate hit point on plane
-                potential_hit = [
-                    projectile.pos[0] - dist * world_normal[0],
-                    projectile.pos[1] - dist * world_normal[1],
-                    projectile.pos[2] - dist * world_normal[2]
-                ]
-                
-                # Check if hit point is inside face bounds
-                if self._point_in_face(potential_hit, world_vertices, face_idx):
-                    closest_dist = abs(dist)
-                    closest_face = face
-                    hit_point = potential_hit
-        
-        if closest_face is not None:
-            return True, {
-                "hit_point": hit_point,
-                "normal": closest_face["normal"],
-                "material": self.material_type
-            }
-            
-        return False, None
-
-    def _point_in_face(self, point, vertices, face_idx):
-        """Check if a point lies within a face's boundaries"""
-        # Different checks based on face orientation
-        if face_idx in [0, 1]:  # Front/Back faces (check X and Y)
-            x, y = 0, 1
-        elif face_idx in [2, 3]:  # Top/Bottom faces (check X and Z)
-            x, y = 0, 2
-        else:  # Left/Right faces (check Y and Z)
-            x, y = 1, 2
-            
-        # Get 2D coordinates of point and vertices for the relevant plane
-        point_2d = [point[x], point[y]]
-        vertices_2d = [[v[x], v[y]] for v in vertices]
-        
-        # Check if point is inside the 2D polygon
-        return self._point_in_polygon_2d(point_2d, vertices_2d)
-        
-    def _point_in_polygon_2d(self, point, vertices):
-        """Check if a 2D point is inside a polygon using ray casting"""
-        x, y = point
-        inside = False
-        
-        j = len(vertices) - 1
-        for i in range(len(vertices)):
-            if ((vertices[i][1] > y) != (vertices[j][1] > y) and
-                x < (vertices[j][0] - vertices[i][0]) * (y - vertices[i][1]) /
-                    (vertices[j][1] - vertices[i][1]) + vertices[i][0]):
-                inside = not inside
-            j = i
-            
-        return inside
+        t, hit_point, normal = hit
+        return True, {
+            "t": t,
+            "hit_point": hit_point,
+            "normal": normal,
+            "material": self.material_type
+        }
 
     def take_damage(self, impact_data):
         """Handle physics-based damage"""
@@ -223,69 +75,15 @@ class EnemyPart:
             
         return False
 
-    def draw(self, enemy_pos):
-        if not self.alive:
-            return
-
-        pos = [
-            enemy_pos[0] + self.relative_pos[0],
-            enemy_pos[1] + self.relative_pos[1],
-            enemy_pos[2] + self.relative_pos[2]
-        ]
-
-        glPushMatrix()
-        glTranslatef(*pos)
-        
-        glColor3f(*self.color)
-        glBegin(GL_QUADS)
-        s = self.size / 2
-        
-        # Front face
-        glVertex3f(-s, -s, s)
-        glVertex3f(s, -s, s)
-        glVertex3f(s, s, s)
-        glVertex3f(-s, s, s)
-        
-        # Back face
-        glVertex3f(-s, -s, -s)
-        glVertex3f(-s, s, -s)
-        glVertex3f(s, s, -s)
-        glVertex3f(s, -s, -s)
-        
-        # Top face
-        glVertex3f(-s, s, -s)
-        glVertex3f(-s, s, s)
-        glVertex3f(s, s, s)
-        glVertex3f(s, s, -s)
-        
-        # Bottom face
-        glVertex3f(-s, -s, -s)
-        glVertex3f(s, -s, -s)
-        glVertex3f(s, -s, s)
-        glVertex3f(-s, -s, s)
-        
-        # Right face
-        glVertex3f(s, -s, -s)
-        glVertex3f(s, s, -s)
-        glVertex3f(s, s, s)
-        glVertex3f(s, -s, s)
-        
-        # Left face
-        glVertex3f(-s, -s, -s)
-        glVertex3f(-s, -s, s)
-        glVertex3f(-s, s, s)
-        glVertex3f(-s, s, -s)
-        
-        glEnd()
-        glPopMatrix()
-
 class Enemy:
-    def __init__(self, pos):
+    def __init__(self, pos, projectiles, enemy_id):
         self.pos = list(pos)
+        self.prev_pos = list(pos)  # Position before the last tick, for interpolation
+        self.id = enemy_id  # Owner id of this enemy's projectiles
         self.speed = 3.0
         self.last_shot_time = 0
         self.shot_cooldown = 2.0
-        self.projectiles = []
+        self.projectiles = projectiles
         self.target_pos = None
         self.movement_timer = 0
         self.movement_interval = 3.0
@@ -299,6 +97,14 @@ class Enemy:
             EnemyPart([0, 0, 0.6], 0.5, 40, [0, 0, 1], "engine", "engine"),  # Engine (blue)
         ]
         
+        # Radius on the XZ plane that encloses every part
+        self.reach = max(math.hypot(max(abs(part.box_min[0]), abs(part.box_max[0])),
+                                    max(abs(part.box_min[2]), abs(part.box_max[2])))
+                         for part in self.parts)
+        # Radius of a sphere around pos enclosing every part, for view culling
+        self.radius = max(math.sqrt(sum(c * c for c in part.relative_pos)) + part.size * math.sqrt(3) / 2
+                          for part in self.parts)
+        
         self.alive = True
 
     def update_movement(self, dt, player_pos):
@@ -344,74 +150,70 @@ class Enemy:
         dz += random.uniform(-1, 1)
         
         direction = [dx, dy, dz]
-        return EnemyProjectile(self.pos.copy(), direction)
-
-    def update_projectiles(self, dt):
-        for projectile in self.projectiles:
-            projectile.update(dt)
-        # Remove projectiles that are too far
-        self.projectiles = [p for p in self.projectiles if p.alive and 
-                          abs(p.pos[0] - self.pos[0]) < 50 and 
-                          abs(p.pos[2] - self.pos[2]) < 50]
-
-    def draw_projectiles(self):
-        for projectile in self.projectiles:
-            projectile.draw()
+        return self.projectiles.spawn(self.pos, direction, TYPE_ENEMY, self.id)
 
     def check_hit(self, projectile):
         if not self.alive:
             return False, None
 
-        # Check each part for hits
+        tracer.begin("Enemy.check_hit")
+        # The part the projectile's path enters first takes the hit
+        first_part, first_hit = None, None
         for part in self.parts:
             hit, hit_data = part.check_collision(projectile, self.pos)
-            if hit:
-                # Calculate impact physics
-                impact_data = projectile.calculate_impact(
-                    hit_data["hit_point"],
-                    hit_data["normal"],
-                    hit_data["material"]
-                )
-                
-                # Apply damage to the part
-                destroyed = part.take_damage(impact_data)
-                
-                # If core is destroyed, enemy dies
-                if destroyed and part.name == "core":
-                    self.alive = False
-                
-                # Modify behavior based on destroyed parts
-                if destroyed:
-                    if part.name == "shield_generator":
-                        # Make all remaining parts more vulnerable
-                        for p in self.parts:
-                            if p.alive:
-                                p.armor_rating *= 0.7
-                    elif part.name in ["weapon_left", "weapon_right"]:
-                        # Increase shot cooldown as weapons are destroyed
-                        self.shot_cooldown *= 1.5
-                    elif part.name == "engine":
-                        # Reduce speed when engine is destroyed
-                        self.speed *= 0.5
-                
-                return True, impact_data["impact_point"]
+            if hit and (first_hit is None or hit_data["t"] < first_hit["t"]):
+                first_part, first_hit = part, hit_data
         
-        return False, None
+        hit_pos = None
+        if first_part is not None:
+            hit_pos = self.apply_hit(first_part, projectile, first_hit["hit_point"], first_hit["normal"])
+        tracer.end("Enemy.check_hit")
+        return first_part is not None, hit_pos
 
-    def draw(self):
-        if not self.alive:
-            return
-            
-        # Draw all alive parts
-        for part in self.parts:
-            part.draw(self.pos)
+    def apply_hit(self, part, projectile, hit_point, normal):
+        """Apply a projectile impact to one part and return the impact point"""
+        # Calculate impact physics
+        impact_data = projectile.calculate_impact(hit_point, normal, part.material_type)
+        
+        # Apply damage to the part
+        destroyed = part.take_damage(impact_data)
+        
+        # If core is destroyed, enemy dies
+        if destroyed and part.name == "core":
+            self.alive = False
+        
+        # Modify behavior based on destroyed parts
+        if destroyed:
+            if part.name == "shield_generator":
+                # Make all remaining parts more vulnerable
+                for p in self.parts:
+                    if p.alive:
+                        p.armor_rating *= 0.7
+            elif part.name in ["weapon_left", "weapon_right"]:
+                # Increase shot cooldown as weapons are destroyed
+                self.shot_cooldown *= 1.5
+            elif part.name == "engine":
+                # Reduce speed when engine is destroyed
+                self.speed *= 0.5
+        
+        return impact_data["impact_point"]
 
 class EnemyManager:
-    def __init__(self):
+    def __init__(self, projectiles=None):
         self.enemies = []
+        self.projectiles = projectiles if projectiles is not None else ProjectileStore()
+        self.next_enemy_id = 0
         self.spawn_timer = 0
         self.spawn_interval = 3.0  # Seconds between spawns
         self.max_enemies = 5
+        # Test all player projectiles against all parts in one batched kernel
+        self.batched_collisions = True
+        # XZ grid pairing projectiles with nearby enemies and the player
+        self.cell_size = 4.0  # Minimum; widened on ticks with long moves
+        self.broadphase = SpatialHash(self.cell_size)
+        self.candidate_pairs = 0  # Narrowphase pairs tested in the last update
+        self.total_candidate_pairs = 0  # And in every update so far
+        self.stats = None  # Optional FrameStats timing AI and collision
 
     def spawn_enemy(self):
         if len(self.enemies) >= self.max_enemies:
@@ -424,60 +226,156 @@ class EnemyManager:
         z = distance * np.sin(angle)
         y = 0  # Spawn at ground level
 
-        self.enemies.append(Enemy([x, y, z]))
+        self.enemies.append(Enemy([x, y, z], self.projectiles, self.next_enemy_id))
+        self.next_enemy_id += 1
 
     def update(self, dt, current_time, player):
+        tracer.begin("EnemyManager.update")
         # Spawn new enemies
         self.spawn_timer += dt
         if self.spawn_timer >= self.spawn_interval:
             self.spawn_timer = 0
             self.spawn_enemy()
 
-        hit_pos = None
-        # Update enemies and check for hits
+        # Update enemy movement and shooting
         for enemy in self.enemies:
             if not enemy.alive:
                 continue
-
-            # Update enemy movement
             enemy.update_movement(dt, player.pos)
-            
-            # Update enemy shooting
-            new_projectile = enemy.shoot_at_player(current_time, player.pos)
-            if new_projectile:
-                enemy.projectiles.append(new_projectile)
-            
-            # Update enemy projectiles
-            enemy.update_projectiles(dt)
-            
-            # Check if enemy projectiles hit player
-            for projectile in enemy.projectiles:
-                if projectile.alive:
-                    if player.check_projectile_hit(projectile.pos, projectile.radius):
-                        projectile.alive = False
-                        # Calculate impact damage for player
-                        impact_data = projectile.calculate_impact(
-                            player.pos,  # Hit point (player center)
-                            [0, 1, 0],   # Default normal (up)
-                            "player"     # Player material type
-                        )
-                        player.take_damage(impact_data["damage"])
-            
-            # Check if player projectiles hit enemy
-            for projectile in player.projectiles:
-                hit, pos = enemy.check_hit(projectile)  # Get both hit status and position
-                if hit:
-                    projectile.alive = False
-                    hit_pos = pos  # Use the actual hit position for particles
+            enemy.shoot_at_player(current_time, player.pos)
+
+        # Advance every projectile, player and enemy, in one step
+        self.projectiles.update(dt)
+        if self.stats is not None:
+            self.stats.lap("enemies")
 
+        # Rebuild the broadphase grid over live projectiles
+        self.candidate_pairs = 0
+        if self.broadphase is not None:
+            self.build_broadphase(player)
+
+        # Check if enemy projectiles near the player hit them
+        _, nearby = self.find_candidates([player.pos], TYPE_ENEMY)
+        for index in nearby:
+            projectile = self.projectiles.get(index)
+            if player.check_projectile_hit(projectile.pos, projectile.radius, projectile.prev_pos):
+                projectile.alive = False
+                # Calculate impact damage for player
+                impact_data = projectile.calculate_impact(
+                    player.pos,  # Hit point (player center)
+                    [0, 1, 0],   # Default normal (up)
+                    "player"     # Player material type
+                )
+                player.take_damage(impact_data["damage"], current_time)
+
+        # Check if player projectiles hit enemies
+        tracer.begin("EnemyManager.check_player_hits")
+        if self.batched_collisions:
+            hit_pos = self.check_player_hits()
+        else:
+            hit_pos = self.check_player_hits_per_part()
+        tracer.end("EnemyManager.check_player_hits")
+        if self.stats is not None:
+            self.stats.lap("collision")
+        tracer.end("EnemyManager.update")
         return hit_pos
 
-    def draw(self):
-        for enemy in self.enemies:
-            if enemy.alive:
-                enemy.draw()
-                enemy.draw_projectiles()
+    def build_broadphase(self, player):
+        """Bucket live projectiles by the midpoint of this frame's move, in cells wide enough to cover any target"""
+        live = self.projectiles.indices()
+        start = self.projectiles.prev_pos[live]
+        end = self.projectiles.pos[live]
+        reach = max([enemy.reach for enemy in self.enemies] + [player.hit_radius])
+        if len(live):
+            move = end[:, ::2] - start[:, ::2]
+            half_move = np.sqrt(np.max(np.sum(move * move, axis=1))) / 2
+            reach += np.max(self.projectiles.radius[live]) + half_move
+        self.broadphase.cell_size = max(self.cell_size, reach)
+        self.broadphase.build((start + end) / 2, live)
+
+    def find_candidates(self, positions, projectile_type):
+        """(position index, projectile slot) pairs from neighbouring grid cells, or all pairs without a broadphase"""
+        if self.broadphase is None:
+            slots = self.projectiles.indices(projectile_type)
+            query_idx = np.repeat(np.arange(len(positions)), len(slots))
+            slot_idx = np.tile(slots, len(positions))
+        else:
+            query_idx, slot_idx = self.broadphase.query(positions)
+            keep = self.projectiles.type[slot_idx] == projectile_type
+            query_idx, slot_idx = query_idx[keep], slot_idx[keep]
+            order = np.lexsort((slot_idx, query_idx))
+            query_idx, slot_idx = query_idx[order], slot_idx[order]
+        self.candidate_pairs += len(slot_idx)
+        self.total_candidate_pairs += len(slot_idx)
+        return query_idx, slot_idx
+
+    def check_player_hits(self):
+        """Resolve player projectile hits with the batched collision kernel"""
+        enemies = [enemy for enemy in self.enemies if enemy.alive]
+        if not enemies:
+            return None
+        enemy_idx, slots = self.find_candidates([enemy.pos for enemy in enemies], TYPE_PLAYER)
+        if len(slots) == 0:
+            return None
+
+        targets = [(i, enemy, part) for i, enemy in enumerate(enemies)
+                   for part in enemy.parts if part.alive]
+        part_count = np.array([sum(1 for part in enemy.parts if part.alive) for enemy in enemies])
+        part_start = np.cumsum(part_count) - part_count
+        target_enemy = np.array([i for i, _, _ in targets])
+        box_min = np.array([[enemy.pos[0] + part.box_min[0],
+                             enemy.pos[1] + part.box_min[1],
+                             enemy.pos[2] + part.box_min[2]] for _, enemy, part in targets])
+        box_max = np.array([[enemy.pos[0] + part.box_max[0],
+                             enemy.pos[1] + part.box_max[1],
+                             enemy.pos[2] + part.box_max[2]] for _, enemy, part in targets])
+
+        # Expand each candidate (enemy, projectile) pair to that enemy's parts
+        pairs = (np.repeat(slots, part_count[enemy_idx]),
+                 concat_ranges(part_start[enemy_idx], part_count[enemy_idx]))
+        slot_idx, part_idx, t, hit_points, normals = segment_box_hits(
+            self.projectiles.prev_pos, self.projectiles.pos, self.projectiles.radius,
+            box_min, box_max, pairs)
+        if len(slot_idx) == 0:
+            return None
+
+        # Apply hits in the same order as the per-part path: enemy by enemy,
+        # projectile by projectile, earliest part along the path still alive.
+        # Each enemy's hits get an Enemy.check_hit span, as on that path.
+        hit_pos = None
+        order = np.lexsort((part_idx, t, slot_idx, target_enemy[part_idx]))
+        ends = np.flatnonzero(np.diff(target_enemy[part_idx[order]])) + 1
+        for group in np.split(order, ends):
+            tracer.begin("Enemy.check_hit")
+            for k in group:
+                _, enemy, part = targets[part_idx[k]]
+                projectile = self.projectiles.get(slot_idx[k])
+                if not (enemy.alive and part.alive and projectile.alive):
+                    continue
+                projectile.alive = False
+                hit_pos = enemy.apply_hit(part, projectile, hit_points[k].tolist(), normals[k])
+            tracer.end("Enemy.check_hit")
+        return hit_pos
+
+    def check_player_hits_per_part(self):
+        """Resolve player projectile hits one projectile and enemy at a time"""
+        enemies = [enemy for enemy in self.enemies if enemy.alive]
+        enemy_idx, slots = self.find_candidates([enemy.pos for enemy in enemies], TYPE_PLAYER)
+        hit_pos = None
+        for i, index in zip(enemy_idx, slots):
+            projectile = self.projectiles.get(index)
+            if not projectile.alive:
+                continue
+            hit, pos = enemies[i].check_hit(projectile)  # Get both hit status and position
+            if hit:
+                projectile.alive = False
+                hit_pos = pos  # Use the actual hit position for particles
+
+        return hit_pos
 
     def cleanup(self):
-        # Remove dead enemies after some time
+        # Remove dead enemies after some time, along with their projectiles
+        for enemy in self.enemies:
+            if not enemy.alive:
+                self.projectiles.kill_owner(enemy.id)
         self.enemies = [e for e in self.enemies if e.alive] 
\ No newline at end of file
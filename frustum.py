@@ -0,0 +1,63 @@
+import math
+import numpy as np
+
+class Frustum:
+    """The camera's view volume, for testing bounding spheres before drawing.
+
+    Built from the same values the renderer hands to gluPerspective and
+    apply_camera: eye position, (pitch, yaw) in degrees, vertical FOV,
+    aspect ratio and clip distances. Points are rotated into camera space,
+    where the four side planes pass through the origin and are symmetric,
+    so each test is a few multiply-adds per sphere.
+    """
+    def __init__(self, position, rotation, fov, aspect, near, far):
+        self.position = np.asarray(position, dtype=np.float64)
+        self.near = near
+        self.far = far
+
+        # World to camera rotation, matching apply_camera: Rx(-pitch) * Ry(-yaw)
+        pitch = math.radians(-rotation[0])
+        yaw = math.radians(-rotation[1])
+        cp, sp = math.cos(pitch), math.sin(pitch)
+        cy, sy = math.cos(yaw), math.sin(yaw)
+        rotate_x = np.array([[1, 0, 0], [0, cp, -sp], [0, sp, cp]])
+        rotate_y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+        self.rotation = rotate_x @ rotate_y
+
+        # Side planes x = +-z * tan_x and y = +-z * tan_y, as unit normals' components
+        tan_y = math.tan(math.radians(fov) / 2)
+        tan_x = tan_y * aspect
+        self.x_normal = np.array([1, tan_x]) / math.hypot(1, tan_x)
+        self.y_normal = np.array([1, tan_y]) / math.hypot(1, tan_y)
+        self.tan_y = tan_y
+
+    def spheres_visible(self, centers, radii):
+        """Boolean mask of the spheres at `centers` (n, 3) that reach inside the frustum.
+
+        `radii` broadcasts against the centers, so a scalar works for points.
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        local = (centers - self.position) @ self.rotation.T
+        x, y, z = local[:, 0], local[:, 1], local[:, 2]
+        # The camera looks down -z
+        return ((np.abs(x) * self.x_normal[0] + z * self.x_normal[1] <= radii)
+                & (np.abs(y) * self.y_normal[0] + z * self.y_normal[1] <= radii)
+                & (-z >= self.near - radii)
+                & (-z <= self.far + radii))
+
+class CullCounter:
+    """Per-frame drawn and culled counts for each kind of renderable"""
+    def __init__(self):
+        self.counts = {}  # kind -> [drawn, culled]
+        self.last_frame = {}  # kind -> (drawn, culled) for the previous full frame
+
+    def add(self, kind, drawn, culled):
+        counts = self.counts.setdefault(kind, [0, 0])
+        counts[0] += drawn
+        counts[1] += culled
+
+    def end_frame(self):
+        self.last_frame = {kind: tuple(counts) for kind, counts in self.counts.items()}
+        self.counts = {}
+
+cull_counts = CullCounter()
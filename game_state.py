@@ -0,0 +1,69 @@
+from particle_system import ParticleSystem
+from player import Player
+from enemy import EnemyManager
+from projectile import ProjectileStore
+from tracing import tracer
+
+class GameState:
+    """The simulation: player, enemies, projectiles and particles.
+
+    Nothing here touches OpenGL, a window or the font system, so it can be
+    stepped headless. Time only advances through update(), which keeps runs
+    reproducible; a renderer can be attached separately to draw it.
+    """
+    def __init__(self, stats=None):
+        self.time = 0.0
+        self.stats = stats  # Optional FrameStats for per-phase timings
+        self.projectiles = ProjectileStore()
+        self.player = Player(self.projectiles)
+        self.particle_system = ParticleSystem()
+        self.enemy_manager = EnemyManager(self.projectiles)
+        self.enemy_manager.stats = stats
+
+    def reset_game(self):
+        self.projectiles.clear()
+        self.player.respawn()
+        self.enemy_manager = EnemyManager(self.projectiles)
+        self.enemy_manager.stats = self.stats
+        self.particle_system = ParticleSystem()
+
+    def respawn_time_remaining(self):
+        """Seconds until the dead player respawns"""
+        return self.player.respawn_delay - (self.time - self.player.death_time)
+
+    def update(self, dt, controls):
+        """Advance the simulation by one tick of `dt` seconds"""
+        tracer.begin("GameState.update")
+        stats = self.stats
+        if stats is not None:
+            stats.lap("input")  # Polling the controls for this tick
+        self.time += dt
+        current_time = self.time
+
+        # Remember where things were so the renderer can blend between ticks
+        self.player.prev_pos = list(self.player.pos)
+        for enemy in self.enemy_manager.enemies:
+            enemy.prev_pos = list(enemy.pos)
+
+        # Update game objects
+        self.player.update(dt, current_time, controls)
+        if stats is not None:
+            stats.lap("player")
+
+        if not self.player.is_dead:
+            # Update enemies and check for hits
+            hit_pos = self.enemy_manager.update(dt, current_time, self.player)
+            if hit_pos:
+                self.particle_system.emit_explosion(hit_pos)
+        else:
+            # Projectiles hold still while the player is dead
+            n = self.projectiles.count
+            self.projectiles.prev_pos[:n] = self.projectiles.pos[:n]
+
+        self.particle_system.update(dt)
+        if stats is not None:
+            stats.lap("particles")
+        self.enemy_manager.cleanup()
+        if stats is not None:
+            stats.lap("enemies")
+        tracer.end("GameState.update")
@@ -0,0 +1,380 @@
+import ctypes
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+import numpy as np
+from gl_resources import gl_resources
+from render_target import set_overlay_blend
+
+POINT_VERTEX_SHADER = """
+#version 120
+attribute float point_size;
+void main() {
+    gl_Position = ftransform();
+    gl_FrontColor = gl_Color;
+    gl_PointSize = point_size;
+}
+"""
+
+POINT_FRAGMENT_SHADER = """
+#version 120
+void main() {
+    gl_FragColor = gl_Color;
+}
+"""
+
+CUBE_VERTEX_SHADER = """
+#version 120
+attribute vec3 offset;
+attribute float scale;
+attribute vec3 color;
+void main() {
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(gl_Vertex.xyz * scale + offset, 1.0);
+    gl_FrontColor = vec4(color, 1.0);
+}
+"""
+
+# Unit cube centred on the origin as 6 quads, in the winding the old per-part code used
+UNIT_CUBE = np.array([
+    (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1),  # Front
+    (-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1),  # Back
+    (-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1),  # Top
+    (-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1),  # Bottom
+    (1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1),  # Right
+    (-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1),  # Left
+], dtype=np.float32) * 0.5
+
+# Blend states points can be grouped by
+BLEND_MODES = {
+    "alpha": (GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA),
+    "additive": (GL_SRC_ALPHA, GL_ONE),
+}
+
+class DrawCallCounter:
+    """Counts draw submissions: glDrawArrays calls and glBegin/glEnd blocks"""
+    def __init__(self):
+        self.calls = 0
+        self.last_frame = 0  # Total for the previous full frame
+
+    def add(self, count=1):
+        self.calls += count
+
+    def end_frame(self):
+        self.last_frame = self.calls
+        self.calls = 0
+
+draw_calls = DrawCallCounter()
+
+class StreamBuffer:
+    """A vertex buffer object that is refilled from a NumPy array every frame"""
+    def __init__(self):
+        self.buffer = None
+
+    def upload(self, data):
+        if self.buffer is None:
+            self.buffer = gl_resources.buffer(data.nbytes)
+        else:
+            gl_resources.resize(("buffer", self.buffer), data.nbytes)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        # Passing the full size each time orphans last frame's storage
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STREAM_DRAW)
+
+    def cleanup(self):
+        if self.buffer is not None:
+            gl_resources.delete(("buffer", self.buffer))
+            self.buffer = None
+
+class PointBatch:
+    """Draws a whole set of colored, individually sized points in one call.
+
+    Positions, colors and sizes are packed into one interleaved vertex
+    buffer (x, y, z, r, g, b, a, size) and submitted with a single
+    glDrawArrays(GL_POINTS). Per-vertex size comes from a tiny shader; if
+    shaders are unavailable every point is drawn at the largest size.
+    """
+    STRIDE = 8 * 4
+
+    def __init__(self, capacity=1024):
+        self.vertices = np.zeros((capacity, 8), dtype=np.float32)
+        self.buffer = StreamBuffer()
+        self.program = None
+        self.size_location = -1
+        self.shader_failed = False
+
+    def _ensure_program(self):
+        if self.program is not None or self.shader_failed:
+            return
+        try:
+            self.program = shaders.compileProgram(
+                shaders.compileShader(POINT_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(POINT_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+            self.size_location = glGetAttribLocation(self.program, "point_size")
+        except Exception as e:
+            print(f"Point shader unavailable, using fixed point size: {str(e)}")
+            self.shader_failed = True
+
+    def _pack(self, positions, colors, sizes):
+        count = len(positions)
+        if count > len(self.vertices):
+            self.vertices = np.zeros((max(count, 2 * len(self.vertices)), 8), dtype=np.float32)
+        vertices = self.vertices[:count]
+        vertices[:, 0:3] = positions
+        vertices[:, 3:7] = colors
+        vertices[:, 7] = sizes
+        return vertices
+
+    def draw(self, positions, colors, sizes, blend="alpha"):
+        """Draw len(positions) points; colors and sizes broadcast against them"""
+        count = len(positions)
+        if count == 0:
+            return
+        self._ensure_program()
+        self.buffer.upload(self._pack(positions, colors, sizes))
+
+        if blend is not None:
+            glEnable(GL_BLEND)
+            glBlendFunc(*BLEND_MODES[blend])
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, self.STRIDE, ctypes.c_void_p(0))
+        glColorPointer(4, GL_FLOAT, self.STRIDE, ctypes.c_void_p(12))
+
+        use_shader = self.program is not None and self.size_location >= 0
+        if use_shader:
+            glUseProgram(self.program)
+            glEnable(GL_VERTEX_PROGRAM_POINT_SIZE)
+            glEnableVertexAttribArray(self.size_location)
+            glVertexAttribPointer(self.size_location, 1, GL_FLOAT, GL_FALSE, self.STRIDE, ctypes.c_void_p(28))
+        else:
+            glPointSize(float(np.max(sizes)))
+
+        glDrawArrays(GL_POINTS, 0, count)
+        draw_calls.add()
+
+        if use_shader:
+            glDisableVertexAttribArray(self.size_location)
+            glDisable(GL_VERTEX_PROGRAM_POINT_SIZE)
+            glUseProgram(0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        if blend is not None:
+            glDisable(GL_BLEND)
+
+    def cleanup(self):
+        self.buffer.cleanup()
+        if self.program is not None:
+            glDeleteProgram(self.program)
+            self.program = None
+
+class CubeBatch:
+    """Draws any number of flat-colored axis-aligned cubes in one call.
+
+    The unit cube lives in a static vertex buffer uploaded once. Each frame
+    only the per-instance offset, scale and color (x, y, z, size, r, g, b)
+    are streamed, and glDrawArraysInstanced reads them through attribute
+    divisors. Without shader or instancing support the cubes are expanded
+    into one vertex array on the CPU instead, which is still one draw call.
+    """
+    STRIDE = 7 * 4
+
+    def __init__(self, capacity=256):
+        self.instances = np.zeros((capacity, 7), dtype=np.float32)
+        self.instance_buffer = StreamBuffer()
+        self.cube_buffer = None
+        self.program = None
+        self.locations = None
+        self.shader_failed = False
+
+    def _ensure_program(self):
+        if self.program is not None or self.shader_failed:
+            return
+        try:
+            if not bool(glDrawArraysInstanced) or not bool(glVertexAttribDivisor):
+                raise RuntimeError("instanced drawing not supported")
+            self.program = shaders.compileProgram(
+                shaders.compileShader(CUBE_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(POINT_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+            self.locations = [glGetAttribLocation(self.program, name) for name in ("offset", "scale", "color")]
+            if min(self.locations) < 0:
+                raise RuntimeError("cube shader attributes missing")
+        except Exception as e:
+            print(f"Instanced cube shader unavailable, expanding cubes on the CPU: {str(e)}")
+            self.program = None
+            self.shader_failed = True
+
+    def _pack(self, offsets, scales, colors):
+        count = len(offsets)
+        if count > len(self.instances):
+            self.instances = np.zeros((max(count, 2 * len(self.instances)), 7), dtype=np.float32)
+        instances = self.instances[:count]
+        instances[:, 0:3] = offsets
+        instances[:, 3] = scales
+        instances[:, 4:7] = colors
+        return instances
+
+    def draw(self, offsets, scales, colors):
+        """Draw len(offsets) cubes centred on `offsets`; scales and colors broadcast against them"""
+        count = len(offsets)
+        if count == 0:
+            return
+        self._ensure_program()
+        instances = self._pack(offsets, scales, colors)
+        if self.program is not None:
+            self._draw_instanced(instances)
+        else:
+            self._draw_expanded(instances)
+        draw_calls.add()
+
+    def _draw_instanced(self, instances):
+        if self.cube_buffer is None:
+            self.cube_buffer = gl_resources.buffer(UNIT_CUBE.nbytes)
+            glBindBuffer(GL_ARRAY_BUFFER, self.cube_buffer)
+            glBufferData(GL_ARRAY_BUFFER, UNIT_CUBE.nbytes, UNIT_CUBE, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.cube_buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+
+        self.instance_buffer.upload(instances)
+        glUseProgram(self.program)
+        for location, size, offset in zip(self.locations, (3, 1, 3), (0, 12, 16)):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, self.STRIDE, ctypes.c_void_p(offset))
+            glVertexAttribDivisor(location, 1)
+
+        glDrawArraysInstanced(GL_QUADS, 0, len(UNIT_CUBE), len(instances))
+
+        for location in self.locations:
+            glVertexAttribDivisor(location, 0)
+            glDisableVertexAttribArray(location)
+        glUseProgram(0)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _draw_expanded(self, instances):
+        count = len(instances)
+        vertices = np.empty((count, len(UNIT_CUBE), 6), dtype=np.float32)
+        vertices[:, :, 0:3] = UNIT_CUBE * instances[:, None, 3:4] + instances[:, None, 0:3]
+        vertices[:, :, 3:6] = instances[:, None, 4:7]
+        self.instance_buffer.upload(vertices)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 24, ctypes.c_void_p(0))
+        glColorPointer(3, GL_FLOAT, 24, ctypes.c_void_p(12))
+        glDrawArrays(GL_QUADS, 0, count * len(UNIT_CUBE))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def cleanup(self):
+        self.instance_buffer.cleanup()
+        if self.cube_buffer is not None:
+            gl_resources.delete(("buffer", self.cube_buffer))
+            self.cube_buffer = None
+        if self.program is not None:
+            glDeleteProgram(self.program)
+            self.program = None
+
+class OverlayBatch:
+    """Collects a frame's 2D overlay quads, lines and text and draws them in one pass.
+
+    Everything queued goes into one interleaved stream buffer of x, y, u, v,
+    r, g, b, a vertices. Geometry is grouped by layer, primitive, material
+    and line width, and each group is one glDrawArrays. A material is None
+    for flat color, or any object with begin() and end() that binds its
+    texture and blending, such as a GlyphAtlas. Groups are drawn in layer
+    order, then in the order their state was first used, so anything that
+    must cover something else of a different state needs a higher layer.
+    """
+    STRIDE = 8 * 4
+
+    def __init__(self):
+        self.groups = {}  # (layer, mode, material, line_width) -> [vertex arrays]
+        self.buffer = StreamBuffer()
+
+    def _add(self, layer, mode, material, vertices, line_width=1.0):
+        key = (layer, mode, material, line_width)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = []
+        group.append(vertices)
+
+    def quad(self, x1, y1, x2, y2, color, layer=0):
+        """Queue a flat-colored rectangle with corners (x1, y1) and (x2, y2)"""
+        vertices = np.empty((4, 8), dtype=np.float32)
+        vertices[:, 0:2] = ((x1, y1), (x2, y1), (x2, y2), (x1, y2))
+        vertices[:, 2:4] = 0
+        vertices[:, 4:8] = color
+        self._add(layer, GL_QUADS, None, vertices)
+
+    def lines(self, points, color, width=1.0, layer=0):
+        """Queue line segments from an (n * 2, 2) array of endpoint pairs"""
+        vertices = np.empty((len(points), 8), dtype=np.float32)
+        vertices[:, 0:2] = points
+        vertices[:, 2:4] = 0
+        vertices[:, 4:8] = color
+        self._add(layer, GL_LINES, None, vertices, width)
+
+    def textured(self, quads, x, y, color, material, layer=0):
+        """Queue textured quads from an (n * 4, 4) array of x, y, u, v, offset by (x, y)"""
+        vertices = np.empty((len(quads), 8), dtype=np.float32)
+        vertices[:, 0:4] = quads
+        vertices[:, 0] += x
+        vertices[:, 1] += y
+        vertices[:, 4:8] = color
+        self._add(layer, GL_QUADS, material, vertices)
+
+    def flush(self, width, height):
+        """Draw everything queued in a width x height top-left-origin ortho pass and clear the queue"""
+        if not self.groups:
+            return
+        keys = sorted(self.groups, key=lambda key: key[0])  # Stable, so first use orders each layer
+        parts = [np.concatenate(self.groups[key]) for key in keys]
+        self.buffer.upload(np.concatenate(parts))
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, width, height, 0, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, self.STRIDE, ctypes.c_void_p(0))
+        glTexCoordPointer(2, GL_FLOAT, self.STRIDE, ctypes.c_void_p(8))
+        glColorPointer(4, GL_FLOAT, self.STRIDE, ctypes.c_void_p(16))
+
+        first = 0
+        for (_, mode, material, line_width), part in zip(keys, parts):
+            if material is None:
+                set_overlay_blend()
+            else:
+                material.begin()
+            if mode == GL_LINES:
+                glLineWidth(line_width)
+            glDrawArrays(mode, first, len(part))
+            draw_calls.add()
+            if material is None:
+                glDisable(GL_BLEND)
+            else:
+                material.end()
+            first += len(part)
+
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        self.groups.clear()
+
+    def cleanup(self):
+        self.buffer.cleanup()
+        self.groups.clear()
@@ -0,0 +1,71 @@
+from OpenGL.GL import *
+
+class GLResource:
+    """One tracked GL object"""
+    __slots__ = ("kind", "name", "nbytes")
+
+    def __init__(self, kind, name, nbytes):
+        self.kind = kind
+        self.name = name
+        self.nbytes = nbytes
+
+class GLResources:
+    """Tracks the GL textures and buffers the game allocates so GPU memory can be accounted for.
+
+    Every object is created here under the key (kind, name) and stays
+    tracked until its owner calls delete(). Anything still tracked at
+    shutdown() is reported as a leak.
+    """
+    KINDS = ("texture", "buffer")
+
+    def __init__(self):
+        self.entries = {}  # (kind, name) -> GLResource
+        self.total_bytes = 0
+
+    def _add(self, kind, name, nbytes):
+        self.entries[(kind, name)] = GLResource(kind, name, nbytes)
+        self.total_bytes += nbytes
+        return name
+
+    def texture(self, nbytes=0):
+        """Generate a texture expected to hold `nbytes` and return its name"""
+        return self._add("texture", glGenTextures(1), nbytes)
+
+    def buffer(self, nbytes=0):
+        """Generate a buffer object and return its name"""
+        return self._add("buffer", glGenBuffers(1), nbytes)
+
+    def resize(self, key, nbytes):
+        """Record that an object's storage changed size"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.total_bytes += nbytes - entry.nbytes
+            entry.nbytes = nbytes
+
+    def delete(self, key):
+        """Free an object"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.nbytes
+        if entry.kind == "texture":
+            glDeleteTextures([entry.name])
+        else:
+            glDeleteBuffers(1, [entry.name])
+
+    def stats(self):
+        """{kind: (count, bytes)} for live objects"""
+        stats = {kind: [0, 0] for kind in self.KINDS}
+        for entry in self.entries.values():
+            stats[entry.kind][0] += 1
+            stats[entry.kind][1] += entry.nbytes
+        return {kind: tuple(counts) for kind, counts in stats.items()}
+
+    def shutdown(self):
+        """Free everything, reporting objects their owners never deleted"""
+        for key, entry in self.entries.items():
+            print(f"Leaked GL {entry.kind} {key!r}: {entry.nbytes} bytes")
+        for key in list(self.entries):
+            self.delete(key)
+
+gl_resources = GLResources()
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+import numpy as np
+import pygame
+from OpenGL.GL import *
+from gl_resources import gl_resources
+from render_target import set_overlay_blend
+
+class GlyphAtlas:
+    """One texture holding the glyphs of every font size in use.
+
+    Glyphs are rasterized the first time they are asked for and packed onto
+    shelves: horizontal bands as tall as their font, each holding glyphs of
+    a single size. Bands are taken from a list of free vertical space. When
+    nothing fits, whole sizes are evicted, least recently used first, and
+    their bands are cleared and returned to the free list. Sizes with quads
+    still waiting in a batch are never evicted, so queued text stays intact.
+    """
+    def __init__(self, width=1024, height=1024, padding=1):
+        self.width = width
+        self.height = height
+        self.padding = padding  # Empty texels around each glyph so filtering can't bleed
+        self.texture = None
+        self.fonts = {}
+        self.glyphs = {}  # (char, font_size) -> glyph info
+        self.shelves = {}  # font_size -> [[y, height, next free x], ...]
+        self.free_bands = [(0, height)]  # (y, height) of unused rows, sorted by y
+        self.sizes = OrderedDict()  # Font sizes in the atlas, least recently used first
+        self.queued = set()  # Sizes drawn since the last flush, which must stay in the atlas
+        self.evictions = 0
+        self.on_evict = None  # Called with a font size after its glyphs are dropped
+
+    def _ensure_texture(self):
+        if self.texture is not None:
+            return
+        self.texture = gl_resources.texture(self.width * self.height * 4)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0, GL_RGBA, GL_UNSIGNED_BYTE,
+                     np.zeros((self.height, self.width, 4), dtype=np.uint8))
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+    def font(self, font_size):
+        if font_size not in self.fonts:
+            self.fonts[font_size] = pygame.font.Font(None, font_size)
+        return self.fonts[font_size]
+
+    def touch(self, font_size):
+        """Mark a size as recently used and queued for drawing"""
+        if font_size in self.sizes:
+            self.sizes.move_to_end(font_size)
+            self.queued.add(font_size)
+
+    def glyph(self, char, font_size):
+        """Glyph info for a character, rasterizing it on first use.
+
+        Returns a dict with width, height and texture coordinates u1, v1
+        (top left) and u2, v2 (bottom right), or None if it cannot fit.
+        """
+        glyph = self.glyphs.get((char, font_size))
+        if glyph is None:
+            glyph = self._insert(char, font_size)
+        return glyph
+
+    def _insert(self, char, font_size):
+        self._ensure_texture()
+        surface = self.font(font_size).render(char, True, (255, 255, 255))
+        width, height = surface.get_size()
+        if (width + self.padding > self.width
+                or max(height, self.font(font_size).get_height()) + self.padding > self.height):
+            print(f"Glyph '{char}' at size {font_size} is larger than the atlas")
+            return None
+        self.sizes[font_size] = True
+        self.sizes.move_to_end(font_size)
+
+        position = self._allocate(font_size, width + self.padding, height + self.padding)
+        while position is None:
+            # Make room by dropping the least recently used size not waiting to be drawn
+            victim = next((size for size in self.sizes
+                           if size != font_size and size not in self.queued), None)
+            if victim is None:
+                break
+            self.evict(victim)
+            position = self._allocate(font_size, width + self.padding, height + self.padding)
+        if position is None:
+            print(f"Glyph atlas is full, cannot fit '{char}' at size {font_size}")
+            return None
+
+        x, y = position
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, width, height, GL_RGBA, GL_UNSIGNED_BYTE,
+                        pygame.image.tostring(surface, 'RGBA', False))
+        glyph = {
+            'width': width,
+            'height': height,
+            'u1': x / self.width,
+            'v1': y / self.height,
+            'u2': (x + width) / self.width,
+            'v2': (y + height) / self.height,
+        }
+        self.glyphs[(char, font_size)] = glyph
+        return glyph
+
+    def _allocate(self, font_size, width, height):
+        """Find room for a width x height block on a shelf of this size"""
+        shelves = self.shelves.setdefault(font_size, [])
+        for shelf in shelves:
+            if height <= shelf[1] and shelf[2] + width <= self.width:
+                x = shelf[2]
+                shelf[2] += width
+                return x, shelf[0]
+
+        # Open a new shelf in the first free band tall enough
+        shelf_height = max(height, self.font(font_size).get_height() + self.padding)
+        for i, (y, band_height) in enumerate(self.free_bands):
+            if band_height >= shelf_height:
+                if band_height == shelf_height:
+                    del self.free_bands[i]
+                else:
+                    self.free_bands[i] = (y + shelf_height, band_height - shelf_height)
+                shelves.append([y, shelf_height, width])
+                return 0, y
+        return None
+
+    def begin(self):
+        """Set up texture state for drawing text"""
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        set_overlay_blend()
+
+    def end(self):
+        glDisable(GL_BLEND)
+        glDisable(GL_TEXTURE_2D)
+        # Queued quads are drawn by now; nothing is inserted during a flush
+        self.queued.clear()
+
+    def evict(self, font_size):
+        """Drop every glyph of one size and free its shelves"""
+        for y, height, _ in self.shelves.pop(font_size, []):
+            # Clear the band so stale texels never show around new glyphs
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, y, self.width, height, GL_RGBA, GL_UNSIGNED_BYTE,
+                            np.zeros((height, self.width, 4), dtype=np.uint8))
+            self.free_bands.append((y, height))
+
+        # Merge neighbouring free bands
+        merged = []
+        for y, height in sorted(self.free_bands):
+            if merged and merged[-1][0] + merged[-1][1] == y:
+                merged[-1] = (merged[-1][0], merged[-1][1] + height)
+            else:
+                merged.append((y, height))
+        self.free_bands = merged
+
+        self.glyphs = {key: glyph for key, glyph in self.glyphs.items() if key[1] != font_size}
+        self.sizes.pop(font_size, None)
+        self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(font_size)
+
+    def cleanup(self):
+        if self.texture is not None:
+            gl_resources.delete(("texture", self.texture))
+            self.texture = None
+        self.glyphs = {}
+        self.shelves = {}
+        self.free_bands = [(0, self.height)]
+        self.sizes.clear()
+        self.queued.clear()
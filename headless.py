@@ -0,0 +1,58 @@
+"""Step the game simulation without a window, OpenGL or fonts.
+
+    python headless.py --ticks 3600 --dt 0.016667 --seed 1234
+
+Useful for profiling the simulation on its own and for running on machines
+with no display.
+"""
+import argparse
+import configparser
+import random
+import time
+from controls import ScriptedInput
+from game_state import GameState
+from tracing import tracer
+
+def run(ticks, dt=1/60, seed=None, controls=None):
+    """Advance a fresh GameState `ticks` times and return it"""
+    if seed is not None:
+        random.seed(seed)
+    game_state = GameState()
+    controls = controls if controls is not None else ScriptedInput()
+    for _ in range(ticks):
+        game_state.update(dt, controls.poll(game_state))
+    return game_state
+
+def main():
+    config = configparser.ConfigParser()
+    config.read('settings.cfg')
+    tick_rate = int(config.get('Game', 'tick_rate', fallback='60'))
+
+    parser = argparse.ArgumentParser(description="Run the game simulation headless")
+    parser.add_argument("--ticks", type=int, default=3600, help="Simulation ticks to run")
+    parser.add_argument("--dt", type=float, default=1/tick_rate, help="Seconds per tick")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible run")
+    parser.add_argument("--trace", default=None, help="Write a Chrome trace of the run to this file")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.start()
+
+    start = time.perf_counter()
+    game_state = run(args.ticks, args.dt, args.seed)
+    elapsed = time.perf_counter() - start
+    if args.trace:
+        tracer.stop()
+        tracer.write(args.trace)
+
+    print(f"{args.ticks} ticks ({args.ticks * args.dt:.1f}s of game time) in {elapsed:.2f}s: "
+          f"{args.ticks / elapsed:.0f} ticks/s")
+    print(f"Enemies: {len(game_state.enemy_manager.enemies)}, "
+          f"projectiles: {len(game_state.projectiles)}, "
+          f"particles: {game_state.particle_system.count}, "
+          f"player health: {game_state.player.health}")
+    print(f"Collision pairs tested: {game_state.enemy_manager.total_candidate_pairs} "
+          f"({game_state.enemy_manager.total_candidate_pairs / args.ticks:.1f}/tick)")
+
+if __name__ == "__main__":
+    main()
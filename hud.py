@@ -0,0 +1,155 @@
+from gl_batch import OverlayBatch
+from perf_hud import PerfHud
+from render_target import RenderTarget
+from text_renderer import TextRenderer
+
+class HudRenderer:
+    """2D overlays drawn on top of the 3D scene: crosshair, health bar,
+    FPS counter, death screen and the optional perf overlay.
+
+    Everything is queued on one OverlayBatch and flushed in a single ortho
+    pass at the end of draw()."""
+    def __init__(self, screen_width, screen_height, show_perf=False):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.batch = OverlayBatch()
+        self.text_renderer = TextRenderer(self.batch)
+        self.perf_hud = PerfHud(self.text_renderer, screen_width, screen_height, show_perf)
+        # The HUD is redrawn offscreen only when what it shows changes
+        self.layer = RenderTarget(screen_width, screen_height)
+        self.layer_key = None
+
+    def hud_key(self, game_state, fps):
+        """Everything the retained HUD layer depends on"""
+        player = game_state.player
+        if player.is_dead:
+            return ("dead", max(0, int(game_state.respawn_time_remaining())))
+        return ("alive", player.health, player.max_health, None if self.perf_hud.visible else fps)
+
+    def draw(self, game_state, fps, stats=None):
+        key = self.hud_key(game_state, fps)
+        if key != self.layer_key:
+            if self.layer.bind():
+                self.draw_layer(game_state, fps)
+                self.batch.flush(self.screen_width, self.screen_height)
+                self.layer.unbind()
+                self.layer_key = key
+            else:
+                self.draw_layer(game_state, fps)
+        if self.layer_key is not None:
+            self.layer.draw(self.batch)
+
+        self.perf_hud.draw(game_state, stats)
+        self.batch.flush(self.screen_width, self.screen_height)
+
+    def draw_layer(self, game_state, fps):
+        player = game_state.player
+        if not player.is_dead:
+            # Draw crosshair
+            self.draw_crosshair(self.screen_width, self.screen_height)
+            
+            # FPS counter (top right), unless the perf overlay already shows it
+            if not self.perf_hud.visible:
+                self.draw_fps(fps)
+            
+            # Health bar
+            self.draw_health_bar(player, self.screen_width, self.screen_height)
+        else:
+            # Draw death screen with countdown
+            time_remaining = game_state.respawn_time_remaining()
+            self.draw_death_screen(player, self.screen_width, self.screen_height, time_remaining)
+
+    def draw_fps(self, fps):
+        fps_text = f"FPS: {fps}"
+        width, _ = self.text_renderer.get_text_dimensions(fps_text, 36)
+        self.text_renderer.draw_text(fps_text, self.screen_width - width - 10, 10, 36)
+
+    def draw_crosshair(self, screen_width, screen_height):
+        # Draw crosshair
+        size = 10
+        center_x = screen_width // 2
+        center_y = screen_height // 2
+        
+        self.batch.lines([
+            # Horizontal line
+            (center_x - size, center_y), (center_x + size, center_y),
+            # Vertical line
+            (center_x, center_y - size), (center_x, center_y + size),
+        ], (1, 1, 1, 1), width=2.0)  # White crosshair
+
+    def draw_death_screen(self, player, screen_width, screen_height, time_remaining):
+        if not player.is_dead or player.death_time is None:
+            return
+
+        # Draw black overlay
+        self.batch.quad(0, 0, screen_width, screen_height, (0, 0, 0, 0.8))
+
+        # Calculate vertical spacing
+        center_y = screen_height // 2
+        spacing = 80  # Vertical space between text elements
+
+        # Draw "YOU HAVE DIED" text centered
+        self.text_renderer.draw_text_centered("YOU HAVE DIED",
+                                            screen_width // 2,
+                                            center_y - spacing,
+                                            140,
+                                            color=(1, 0, 0, 1))
+        
+        # Draw "respawning in" text centered
+        self.text_renderer.draw_text_centered("respawning in",
+                                            screen_width // 2,
+                                            center_y,
+                                            72)
+        
+        # Draw countdown centered
+        self.text_renderer.draw_text_centered(str(max(0, int(time_remaining))),
+                                            screen_width // 2,
+                                            center_y + spacing,
+                                            96)
+
+    def draw_health_bar(self, player, screen_width, screen_height):
+        # Health bar settings
+        bar_width = 200
+        bar_height = 20
+        x = 10
+        y = 10
+        border = 2
+        health_percentage = player.health / player.max_health
+
+        # Draw border (black)
+        self.batch.quad(x - border, y - border, x + bar_width + border, y + bar_height + border, (0, 0, 0, 1))
+
+        # Draw background (dark gray)
+        self.batch.quad(x, y, x + bar_width, y + bar_height, (0.2, 0.2, 0.2, 1))
+
+        # Draw health bar with color gradient
+        if health_percentage > 0:
+            # Color changes from green to yellow to red
+            if health_percentage > 0.5:
+                r = 2.0 * (1 - health_percentage)  # 0.5 -> 1: 1 -> 0
+                g = 1.0
+            else:
+                r = 1.0
+                g = 2.0 * health_percentage  # 0 -> 0.5: 0 -> 1
+            
+            bar_fill_width = bar_width * health_percentage
+            self.batch.quad(x, y, x + bar_fill_width, y + bar_height, (r, g, 0, 1))
+
+        # Draw text
+        percentage_text = f"{int(health_percentage * 100)}%"
+        fraction_text = f"{round(player.health, 1)}/{player.max_health}"  # Round displayed health to 1 decimal
+        
+        # Draw percentage text (centered in health bar)
+        self.text_renderer.draw_text_centered_rect(percentage_text, 
+                                                 x, y, bar_width, bar_height, 24)
+        
+        # Draw fraction text (to the right of health bar)
+        fraction_width, fraction_height = self.text_renderer.get_text_dimensions(fraction_text, 24)
+        self.text_renderer.draw_text(fraction_text, 
+                                   x + bar_width + 10,
+                                   y + (bar_height - fraction_height) // 2, 24)
+
+    def cleanup(self):
+        """Clean up resources"""
+        self.text_renderer.cleanup()  # Also frees the shared batch
+        self.layer.cleanup()
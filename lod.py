@@ -0,0 +1,31 @@
+import numpy as np
+
+class LevelOfDetail:
+    """Picks a detail level per object from its distance to the camera.
+
+    Level 0 is full detail; an object is at level i once it is farther than
+    distances[i - 1]. To stop objects near a boundary flickering between
+    levels, an object only drops detail once it is `hysteresis` units past
+    a boundary and only regains it once it is that far back inside. The
+    last level of each object is remembered by key between calls.
+    """
+    def __init__(self, distances, hysteresis=2.0):
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.levels = {}  # key -> level chosen last call
+
+    def select(self, keys, distances):
+        """Levels for objects `keys` at `distances`, as an int array.
+
+        Objects missing from `keys` are forgotten, so pass every live one.
+        """
+        distances = np.asarray(distances, dtype=np.float64)[:, None]
+        # Levels allowed at this distance: no finer than `finest`, no coarser than `coarsest`
+        coarsest = np.count_nonzero(distances > self.distances - self.hysteresis, axis=1)
+        finest = np.count_nonzero(distances > self.distances + self.hysteresis, axis=1)
+        plain = np.count_nonzero(distances > self.distances, axis=1)
+        previous = np.array([self.levels.get(key, -1) for key in keys], dtype=np.int64)
+        # New objects take the plain level; others keep theirs unless pushed out of range
+        levels = np.where(previous < 0, plain, np.clip(previous, finest, coarsest))
+        self.levels = dict(zip(keys, levels.tolist()))
+        return levels
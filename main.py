@@ -43,11 +43,13 @@ try:
     from pygame.locals import *
     from OpenGL.GL import *
     from OpenGL.GLU import *
-    import math
-    import numpy as np
-    from particle_system import ParticleSystem
-    from player import Player
-    from enemy import EnemyManager
+    from controls import InputState
+    from game_state import GameState
+    from renderer import GameRenderer
+    from timestep import FixedTimestep
+    from perf_stats import FrameStats
+    from tracing import tracer
+    from gl_resources import gl_resources
     print("All modules imported successfully")
 except ImportError as e:
     print(f"Failed to import required modules: {str(e)}")
@@ -112,119 +114,65 @@ except Exception as e:
     pygame.quit()
     sys.exit(1)
 
-# Camera settings
-fov = 90
-aspect_ratio = display[0] / display[1]
-near_clip = 0.1
-far_clip = 100.0
-
-def draw_floor():
-    glBegin(GL_QUADS)
-    glColor3f(0.5, 0.5, 0.5)
-    size = 50  # Increased floor size
-    glVertex3f(-size, -2, -size)
-    glVertex3f(size, -2, -size)
-    glVertex3f(size, -2, size)
-    glVertex3f(-size, -2, size)
-    glEnd()
-
-class GameState:
-    def __init__(self):
-        # Load settings
-        config = configparser.ConfigParser()
-        config.read('settings.cfg')
-        
-        self.screen_width = int(config.get('Game', 'screen_width', fallback='800'))
-        self.screen_height = int(config.get('Game', 'screen_height', fallback='600'))
-        
-        self.player = Player()
-        self.particle_system = ParticleSystem()
-        self.enemy_manager = EnemyManager()
-        self.last_time = time.time()
-        self.frame_count = 0
-        self.last_fps_update = time.time()
-        self.fps = 0
-        self.font = pygame.font.Font(None, 36)
-
-    def reset_game(self):
-        self.player.respawn()
-        self.enemy_manager = EnemyManager()
-        self.particle_system = ParticleSystem()
-
-    def update(self):
-        current_time = time.time()
-        dt = current_time - self.last_time
-        self.last_time = current_time
-
-        # Update FPS counter
-        self.frame_count += 1
-        if current_time - self.last_fps_update >= 1.0:
-            self.fps = self.frame_count
-            self.frame_count = 0
-            self.last_fps_update = current_time
-
-        # Update game objects
-        self.player.update(dt, current_time)
-        
-        if not self.player.is_dead:
-            # Update enemies and check for hits
-            hit_pos = self.enemy_manager.update(dt, current_time, self.player)
-            if hit_pos:
-                self.particle_system.emit_explosion(hit_pos)
-        
-        self.particle_system.update(dt)
-        self.enemy_manager.cleanup()
-
-    def draw(self):
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-        gluPerspective(self.player.get_current_fov(), aspect_ratio, near_clip, far_clip)
-        
-        self.player.apply_transform()
-        
-        # Enable depth testing
-        glEnable(GL_DEPTH_TEST)
-        
-        # Draw 3D scene
-        draw_floor()
-        self.enemy_manager.draw()
-        self.player.draw_projectiles()
-        self.particle_system.draw()
-        
-        # Draw 2D overlays
-        glDisable(GL_DEPTH_TEST)
-        
-        if not self.player.is_dead:
-            # Draw crosshair
-            self.player.draw_crosshair(self.screen_width, self.screen_height)
-            
-            # Draw UI elements
-            pygame.display.get_surface().fill((0, 0, 0, 0))
-            
-            # FPS counter (top right)
-            fps_text = self.font.render(f"FPS: {self.fps}", True, (255, 255, 255))
-            pygame.display.get_surface().blit(fps_text, 
-                (self.screen_width - fps_text.get_width() - 10, 10))
-            
-            # Health bar
-            self.player.draw_health_bar(self.screen_width, self.screen_height)
-        else:
-            # Draw death screen with countdown
-            time_remaining = self.player.respawn_delay - (time.time() - self.player.death_time)
-            self.player.draw_death_screen(self.screen_width, self.screen_height, time_remaining)
+class PygameInput:
+    """Reads the mouse and keyboard into an InputState each frame"""
+    def poll(self, game_state):
+        keys = pygame.key.get_pressed()
+        return InputState(
+            mouse_buttons=pygame.mouse.get_pressed(),
+            mouse_rel=pygame.mouse.get_rel(),
+            move_x=keys[pygame.K_d] - keys[pygame.K_a],
+            move_z=keys[pygame.K_s] - keys[pygame.K_w],
+        )
 
 def main():
-    game_state = GameState()
+    # Simulation runs at a fixed tick rate; rendering runs as fast as allowed
+    tick_rate = int(config.get('Game', 'tick_rate', fallback='60'))
+    max_ticks_per_frame = int(config.get('Game', 'max_ticks_per_frame', fallback='5'))
+    max_fps = int(config.get('Game', 'max_fps', fallback='0'))
+
+    # Frame timing stats; F8 writes them out, as can quitting
+    history_frames = int(config.get('Perf', 'history_frames', fallback='600'))
+    stats_file = config.get('Perf', 'stats_file', fallback='frame_stats.json').strip()
+    dump_on_exit = config.getboolean('Perf', 'dump_on_exit', fallback=False)
+    stats = FrameStats(history_frames)
+
+    # Span tracing is off unless enabled here or toggled with F9
+    trace_file = config.get('Perf', 'trace_file', fallback='trace.json').strip()
+    if config.getboolean('Perf', 'trace', fallback=False):
+        tracer.start()
+
+    game_state = GameState(stats)
+    show_perf = config.getboolean('Perf', 'show_hud', fallback=False)
+    renderer = GameRenderer(display[0], display[1], show_perf)
+    renderer.stats = stats
+    controls = PygameInput()
+    timestep = FixedTimestep(tick_rate, max_ticks_per_frame)
     clock = pygame.time.Clock()
+    last_time = time.perf_counter()
+    last_fps_update = last_time
+    fps = 0
+
+    def shutdown():
+        if tracer.enabled:
+            tracer.stop()
+            tracer.write(trace_file)
+        if dump_on_exit:
+            stats.dump(stats_file)
+            print(stats.summary())
+        renderer.cleanup()
+        gl_resources.shutdown()  # Reports anything cleanup missed
+        pygame.quit()
 
     while True:
+        stats.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
+                shutdown()
                 return
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    pygame.quit()
+                    shutdown()
                     return
                 # Adjust mouse sensitivity
                 elif event.key == pygame.K_COMMA:  # < key
@@ -233,11 +181,37 @@ def main():
                 elif event.key == pygame.K_PERIOD:  # > key
                     sensitivity = game_state.player.mouse_sensitivity + 0.05
                     game_state.player.set_mouse_sensitivity(sensitivity)
-
-        game_state.update()
-        game_state.draw()
+                elif event.key == pygame.K_F3:
+                    renderer.hud.perf_hud.toggle()
+                elif event.key == pygame.K_F8:
+                    stats.dump(stats_file)
+                    print(stats.summary())
+                elif event.key == pygame.K_F9:
+                    if tracer.enabled:
+                        tracer.stop()
+                        tracer.write(trace_file)
+                    else:
+                        print("Tracing started")
+                        tracer.start()
+        stats.lap("input")
+
+        current_time = time.perf_counter()
+        frame_time = current_time - last_time
+        last_time = current_time
+
+        # Refresh the FPS counter once a second
+        if current_time - last_fps_update >= 1.0:
+            fps = round(stats.fps())
+            last_fps_update = current_time
+
+        for _ in range(timestep.advance(frame_time)):
+            game_state.update(timestep.dt, controls.poll(game_state))
+        renderer.draw(game_state, fps, timestep.alpha)
+        tracer.begin("pygame.display.flip")
         pygame.display.flip()
-        clock.tick(60)
+        tracer.end("pygame.display.flip")
+        stats.lap("flip")
+        clock.tick(max_fps)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
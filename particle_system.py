@@ -1,74 +1,144 @@
+import configparser
 import random
-import time
-from OpenGL.GL import *
 import numpy as np
+from soa import compact
 
-class Particle:
-    def __init__(self, pos, velocity, lifetime, color, size=2.0):
-        self.pos = list(pos)
-        self.velocity = list(velocity)
-        self.lifetime = lifetime
-        self.birth_time = time.time()
-        self.color = color
-        self.size = size
-        self.gravity = -9.8
+GRAVITY = -9.8
+
+# Blend states particles are grouped by; each group draws in one call
+BLEND_GROUPS = ("alpha", "additive")
+
+# Victim selection when a full pool must make room; the key is smallest-first
+EVICTION_POLICIES = {
+    "oldest": lambda store, n: -store.age[:n],
+    "lowest_remaining": lambda store, n: store.lifetime[:n] - store.age[:n],
+}
+
+class ParticleStore:
+    """Fixed-capacity pool of particles, one preallocated NumPy array per attribute, live ones packed first"""
+    def __init__(self, capacity=4096, eviction="oldest"):
+        if eviction not in EVICTION_POLICIES:
+            print(f"Unknown particle eviction policy '{eviction}', using 'oldest'")
+            eviction = "oldest"
+        self.capacity = capacity
+        self.eviction = eviction
+        self.count = 0
+        self.evicted = 0
+        self.pos = np.zeros((capacity, 3), dtype=np.float32)
+        self.prev_pos = np.zeros((capacity, 3), dtype=np.float32)  # Before the last update, for interpolation
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 4), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        # Scratch space so integration never allocates
+        self._step = np.zeros((capacity, 3), dtype=np.float32)
+        self._alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    def _arrays(self):
+        return (self.pos, self.prev_pos, self.velocity, self.age, self.lifetime, self.color, self.size)
+
+    def _compact(self, keep):
+        """Pack the particles flagged in `keep` (length count) into the front slots"""
+        # Allocates small index arrays, sized by how many particles move into freed slots
+        self.count = compact(self._arrays(), keep)
+
+    def _evict(self, amount):
+        n = self.count
+        key = EVICTION_POLICIES[self.eviction](self, n)
+        victims = np.argpartition(key, amount - 1)[:amount]
+        keep = np.ones(n, dtype=bool)
+        keep[victims] = False
+        self._compact(keep)
+        self.evicted += amount
+
+    def spawn(self, pos, velocity, lifetime, color, size):
+        """Add a batch of particles; `velocity` is (n, 3), the rest broadcast"""
+        count = len(velocity)
+        if count == 0 or self.capacity == 0:
+            return
+        lifetime = np.broadcast_to(lifetime, (count,))
+        color = np.broadcast_to(color, (count, 4))
+        if count > self.capacity:
+            # Only the newest particles of an oversized batch can fit
+            velocity = velocity[-self.capacity:]
+            lifetime = lifetime[-self.capacity:]
+            color = color[-self.capacity:]
+            count = self.capacity
+        free = self.capacity - self.count
+        if count > free:
+            self._evict(count - free)
+
+        start, end = self.count, self.count + count
+        self.pos[start:end] = pos
+        self.prev_pos[start:end] = pos
+        self.velocity[start:end] = velocity
+        self.age[start:end] = 0
+        self.lifetime[start:end] = lifetime
+        self.color[start:end] = color
+        self.size[start:end] = size
+        self.count = end
 
     def update(self, dt):
-        self.pos[0] += self.velocity[0] * dt
-        self.pos[1] += self.velocity[1] * dt + 0.5 * self.gravity * dt * dt
-        self.pos[2] += self.velocity[2] * dt
-        self.velocity[1] += self.gravity * dt
-
-    def is_alive(self):
-        return time.time() - self.birth_time < self.lifetime
-
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(*self.pos)
-        glColor4f(*self.color)
-        glPointSize(self.size)
-        glBegin(GL_POINTS)
-        glVertex3f(0, 0, 0)
-        glEnd()
-        glPopMatrix()
+        # Age everything, then drop expired particles before integrating
+        n = self.count
+        age = self.age[:n]
+        age += dt
+        alive = self._alive[:n]
+        np.less(age, self.lifetime[:n], out=alive)
+        if not alive.all():
+            self._compact(alive)
+            n = self.count
+
+        step = self._step[:n]
+        velocity = self.velocity[:n]
+        np.multiply(velocity, dt, out=step)
+        self.prev_pos[:n] = self.pos[:n]
+        self.pos[:n] += step
+        self.pos[:n, 1] += 0.5 * GRAVITY * dt * dt
+        velocity[:, 1] += GRAVITY * dt
 
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
-
-    def emit_explosion(self, pos, count=20):
-        for _ in range(count):
-            speed = random.uniform(5, 10)
-            direction = [
-                random.uniform(-1, 1),
-                random.uniform(-1, 1),
-                random.uniform(-1, 1)
-            ]
-            # Normalize direction
-            length = np.sqrt(sum(x*x for x in direction))
-            velocity = [d * speed / length for d in direction]
-            
-            color = (1, random.uniform(0, 0.5), 0, 1)  # Red-orange explosion
-            self.particles.append(Particle(pos, velocity, random.uniform(0.3, 0.7), color, 3.0))
-
-    def emit_hit(self, pos, count=10):
-        for _ in range(count):
-            velocity = [
-                random.uniform(-3, 3),
-                random.uniform(2, 5),
-                random.uniform(-3, 3)
-            ]
-            color = (1, 1, 0, 1)  # Yellow spark
-            self.particles.append(Particle(pos, velocity, random.uniform(0.2, 0.4), color, 2.0))
+    def __init__(self, rng=None, capacity=None, eviction=None):
+        # Load settings; explicit arguments override them
+        config = configparser.ConfigParser()
+        config.read('settings.cfg')
+
+        if capacity is None:
+            capacity = int(config.get('Particles', 'capacity', fallback='4096'))
+        if eviction is None:
+            eviction = config.get('Particles', 'eviction', fallback='oldest').strip()
+
+        # One pool per blend state so each group draws in a single call
+        self.layers = {blend: ParticleStore(capacity, eviction) for blend in BLEND_GROUPS}
+        # Seeded from `random` by default, so seeding the game also seeds the particles
+        self.rng = rng if rng is not None else np.random.default_rng(random.getrandbits(64))
+
+    @property
+    def count(self):
+        return sum(len(store) for store in self.layers.values())
+
+    def emit_explosion(self, pos, count=20, blend="alpha"):
+        speed = self.rng.uniform(5, 10, size=(count, 1))
+        direction = self.rng.uniform(-1, 1, size=(count, 3))
+        # Normalize direction
+        length = np.sqrt(np.sum(direction * direction, axis=1, keepdims=True))
+        velocity = direction * speed / length
+
+        color = np.zeros((count, 4))
+        color[:, 0] = 1
+        color[:, 1] = self.rng.uniform(0, 0.5, size=count)  # Red-orange explosion
+        color[:, 3] = 1
+        self.layers[blend].spawn(pos, velocity, self.rng.uniform(0.3, 0.7, size=count), color, 3.0)
+
+    def emit_hit(self, pos, count=10, blend="alpha"):
+        velocity = self.rng.uniform((-3, 2, -3), (3, 5, 3), size=(count, 3))
+        color = (1, 1, 0, 1)  # Yellow spark
+        self.layers[blend].spawn(pos, velocity, self.rng.uniform(0.2, 0.4, size=count), color, 2.0)
 
     def update(self, dt):
-        self.particles = [p for p in self.particles if p.is_alive()]
-        for particle in self.particles:
-            particle.update(dt)
-
-    def draw(self):
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        for particle in self.particles:
-            particle.draw()
-        glDisable(GL_BLEND) 
\ No newline at end of file
+        for store in self.layers.values():
+            store.update(dt)
@@ -0,0 +1,109 @@
+import time
+import numpy as np
+from frustum import cull_counts
+from gl_batch import draw_calls
+from gl_resources import gl_resources
+
+class PerfHud:
+    """Toggleable performance overlay: frame-time graph, per-phase timings,
+    entity counts and the previous frame's draw-call count.
+
+    Everything is queued on the text renderer's OverlayBatch, so the panel,
+    graph and text cost a few draw calls however many lines there are. The
+    text is only re-formatted a few times a second, which keeps the numbers
+    readable and the overlay cheap enough to leave on.
+    """
+    def __init__(self, text_renderer, screen_width, screen_height, visible=False):
+        self.text_renderer = text_renderer
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.visible = visible
+        self.width = 300
+        self.x = screen_width - self.width - 15  # Top right, clear of the health bar
+        self.y = 15
+        self.graph_frames = 240
+        self.graph_height = 60
+        self.graph_max_ms = 50.0  # Frame time at the top of the graph
+        self.font_size = 20
+        self.line_height = 18
+        self.refresh_interval = 0.25  # Seconds between text updates
+        self.last_refresh = -np.inf
+        self.lines = []
+        self.graph = np.zeros((2 * self.graph_frames, 2), dtype=np.float32)
+        self.layer = 2  # Overlay batch layer, above the HUD and its text
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def refresh_text(self, game_state, stats):
+        recent = stats.last(60) * 1000
+        lines = []
+        if len(recent):
+            frame_ms = recent[:, -1]
+            lines.append(f"FPS {stats.fps():.0f}   frame {frame_ms.mean():.2f} ms   p95 {np.percentile(frame_ms, 95):.2f}")
+            for phase, ms in zip(stats.phases, recent[:, :-1].mean(axis=0)):
+                lines.append((phase.replace("_", " "), f"{ms:.3f} ms"))
+        lines.append(f"draw calls {draw_calls.last_frame}")
+        # Drawn out of live, after view culling
+        lines.append("in view " + "   ".join(f"{kind} {drawn}/{drawn + culled}"
+                                             for kind, (drawn, culled) in cull_counts.last_frame.items()))
+        gl = gl_resources.stats()
+        lines.append(f"gl {gl_resources.total_bytes / 2**20:.1f} MB   textures {gl['texture'][0]}   "
+                     f"buffers {gl['buffer'][0]}")
+        lines.append(f"enemies {len(game_state.enemy_manager.enemies)}   "
+                     f"projectiles {len(game_state.projectiles)}   "
+                     f"particles {game_state.particle_system.count}")
+        lines.append(f"collision pairs {game_state.enemy_manager.candidate_pairs}")
+        self.lines = lines
+
+    def draw_graph(self, stats, top):
+        frame_ms = stats.last(self.graph_frames)[:, -1] * 1000
+        n = len(frame_ms)
+        if n < 2:
+            return
+        batch = self.text_renderer.batch
+        bottom = top + self.graph_height
+
+        # 60 and 30 FPS budget lines
+        budgets = []
+        for budget_ms in (1000 / 60, 1000 / 30):
+            y = bottom - budget_ms / self.graph_max_ms * self.graph_height
+            budgets += [(self.x, y), (self.x + self.width, y)]
+        batch.lines(budgets, (1, 1, 1, 0.3), layer=self.layer)
+
+        # The frame-time curve as segments joining consecutive samples
+        graph = self.graph[:2 * n - 2]
+        x = self.x + np.arange(n) * (self.width / self.graph_frames)
+        y = bottom - np.minimum(frame_ms / self.graph_max_ms, 1.0) * self.graph_height
+        graph[0::2, 0], graph[1::2, 0] = x[:-1], x[1:]
+        graph[0::2, 1], graph[1::2, 1] = y[:-1], y[1:]
+        batch.lines(graph, (0.2, 1, 0.2, 1), layer=self.layer)
+
+    def draw(self, game_state, stats):
+        """Queue the overlay on the text renderer's batch"""
+        if not self.visible or stats is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_refresh >= self.refresh_interval:
+            self.refresh_text(game_state, stats)
+            self.last_refresh = now
+
+        # Translucent backing panel
+        text_height = len(self.lines) * self.line_height
+        panel_bottom = self.y + self.graph_height + 10 + text_height
+        self.text_renderer.batch.quad(self.x - 5, self.y - 5, self.x + self.width + 5, panel_bottom + 5,
+                                      (0, 0, 0, 0.6), layer=self.layer)
+
+        self.draw_graph(stats, self.y)
+
+        y = self.y + self.graph_height + 10
+        text_layer = self.layer + 1
+        for line in self.lines:
+            if isinstance(line, tuple):
+                # Phase name and its time, in two columns
+                name, value = line
+                self.text_renderer.draw_text(name, self.x, y, self.font_size, layer=text_layer)
+                self.text_renderer.draw_text(value, self.x + 120, y, self.font_size, layer=text_layer)
+            else:
+                self.text_renderer.draw_text(line, self.x, y, self.font_size, layer=text_layer)
+            y += self.line_height
@@ -0,0 +1,107 @@
+import csv
+import json
+import time
+import numpy as np
+
+# Phases of a frame, in the order they run
+PHASES = ("input", "player", "enemies", "collision", "particles", "draw_3d", "draw_2d", "flip")
+
+class FrameStats:
+    """Per-phase frame timings kept in a ring buffer of recent frames.
+
+    Code being timed calls lap(phase) when a phase finishes; the time since
+    the previous lap (or begin_frame) is added to that phase, so phases that
+    run several times a frame, like simulation ticks, accumulate. end_frame()
+    stores the frame's row, with the full frame interval in the last column.
+    """
+    def __init__(self, capacity=600, phases=PHASES):
+        self.phases = phases
+        self.columns = phases + ("frame",)
+        self.index = {phase: i for i, phase in enumerate(phases)}
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, len(self.columns)))
+        self.frames = 0  # Total frames recorded, including overwritten ones
+        self.current = np.zeros(len(self.columns))
+        self.frame_start = None
+        self.lap_start = 0.0
+
+    def __len__(self):
+        return min(self.frames, self.capacity)
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.end_frame(now)
+        self.frame_start = now
+        self.lap_start = now
+        self.current[:] = 0
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[self.index[phase]] += now - self.lap_start
+        self.lap_start = now
+
+    def end_frame(self, now):
+        """Store the frame that began at frame_start and ended at `now`"""
+        self.current[-1] = now - self.frame_start
+        self.samples[self.frames % self.capacity] = self.current
+        self.frames += 1
+
+    def last(self, frames):
+        """The most recent `frames` rows (fewer if not yet recorded), oldest first, in seconds"""
+        n = min(frames, len(self))
+        return self.samples[(self.frames - n + np.arange(n)) % self.capacity]
+
+    def recent(self):
+        """Every recorded row, oldest first, in seconds"""
+        return self.last(self.capacity)
+
+    def fps(self, frames=60):
+        """Frame rate over the last `frames` frames"""
+        intervals = self.last(frames)[:, -1]
+        total = intervals.sum()
+        return len(intervals) / total if total > 0 else 0.0
+
+    def percentiles(self):
+        """{column: {"p50", "p95", "p99", "mean"}} in milliseconds over the buffer"""
+        if len(self) == 0:
+            return {}
+        ms = self.samples[:len(self)] * 1000
+        p50, p95, p99 = np.percentile(ms, (50, 95, 99), axis=0)
+        mean = ms.mean(axis=0)
+        return {column: {"p50": float(p50[i]), "p95": float(p95[i]),
+                         "p99": float(p99[i]), "mean": float(mean[i])}
+                for i, column in enumerate(self.columns)}
+
+    def summary(self):
+        lines = [f"{'phase':<12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+        for column, stats in self.percentiles().items():
+            lines.append(f"{column:<12}{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['p99']:>9.3f}")
+        return "\n".join(lines)
+
+    def dump_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([f"{column}_ms" for column in self.columns])
+            for row in self.recent():
+                writer.writerow([f"{value * 1000:.4f}" for value in row])
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({
+                "frames": self.frames,
+                "percentiles_ms": self.percentiles(),
+                "columns": list(self.columns),
+                "samples_ms": (self.recent() * 1000).round(4).tolist(),
+            }, f, indent=2)
+
+    def dump(self, path):
+        """Write the buffer to `path`, as CSV if it ends in .csv, otherwise JSON"""
+        try:
+            if path.lower().endswith(".csv"):
+                self.dump_csv(path)
+            else:
+                self.dump_json(path)
+            print(f"Frame stats for {len(self)} frames written to {path}")
+        except OSError as e:
+            print(f"Failed to write frame stats to {path}: {str(e)}")
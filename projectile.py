@@ -1,47 +1,105 @@
-from OpenGL.GL import *
 import numpy as np
 import math
+from soa import compact
+
+# Damage profiles shared by every projectile, indexed by ProjectileStore.profile
+DAMAGE_PROFILES = [
+    {  # Default
+        "impact": 20,  # Base impact damage
+        "penetration": 0.5,  # How well it penetrates armor (0-1)
+        "splash": 0,  # Splash damage radius
+        "energy_transfer": 0.8,  # How much energy is transferred to the target (0-1)
+    },
+    {  # Player
+        "impact": 25,
+        "penetration": 0.7,
+        "splash": 0,
+        "energy_transfer": 0.9
+    },
+    {  # Enemy
+        "impact": 15,
+        "penetration": 0.4,
+        "splash": 0.5,
+        "energy_transfer": 0.6
+    },
+]
+PROFILE_DEFAULT, PROFILE_PLAYER, PROFILE_ENEMY = range(len(DAMAGE_PROFILES))
+
+# Per-type defaults; range is measured along X and Z from the spawn point
+PROJECTILE_TYPES = [
+    {"name": "player", "speed": 30.0, "profile": PROFILE_PLAYER, "color": (1, 1, 0), "size": 5.0, "range": 100},
+    {"name": "enemy", "speed": 20.0, "profile": PROFILE_ENEMY, "color": (1, 0, 0), "size": 5.0, "range": 50},
+]
+TYPE_PLAYER, TYPE_ENEMY = range(len(PROJECTILE_TYPES))
+TYPE_RANGES = np.array([t["range"] for t in PROJECTILE_TYPES], dtype=np.float64)
+
+OWNER_PLAYER = -1
 
 class Projectile:
-    def __init__(self, pos, direction, speed, damage_profile=None):
-        self.pos = list(pos)
-        # Normalize direction
-        length = np.sqrt(sum(x*x for x in direction))
-        self.velocity = [d * speed / length for d in direction]
-        self.alive = True
-        self.radius = 0.2
-        
-        # Default damage profile if none provided
-        self.damage_profile = damage_profile or {
-            "impact": 20,  # Base impact damage
-            "penetration": 0.5,  # How well it penetrates armor (0-1)
-            "splash": 0,  # Splash damage radius
-            "energy_transfer": 0.8,  # How much energy is transferred to the target (0-1)
-        }
-        
+    """Handle to one slot of a ProjectileStore, valid until its next update() compacts slots"""
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
         # Physics properties
         self.mass = 0.1  # kg
-        self.energy = 0.5 * self.mass * (speed ** 2)  # Kinetic energy
-        
-    def update(self, dt):
-        self.pos[0] += self.velocity[0] * dt
-        self.pos[1] += self.velocity[1] * dt
-        self.pos[2] += self.velocity[2] * dt
-        
+
+    @property
+    def pos(self):
+        return self.store.pos[self.index]
+
+    @property
+    def prev_pos(self):
+        """Position at the start of the last update"""
+        return self.store.prev_pos[self.index]
+
+    @property
+    def velocity(self):
+        return self.store.velocity[self.index]
+
+    @property
+    def radius(self):
+        return self.store.radius[self.index]
+
+    @property
+    def owner(self):
+        return int(self.store.owner[self.index])
+
+    @property
+    def projectile_type(self):
+        return int(self.store.type[self.index])
+
+    @property
+    def damage_profile(self):
+        return DAMAGE_PROFILES[self.store.profile[self.index]]
+
+    @property
+    def energy(self):
+        speed_squared = float(np.dot(self.velocity, self.velocity))
+        return 0.5 * self.mass * speed_squared  # Kinetic energy
+
+    @property
+    def alive(self):
+        return bool(self.store.alive[self.index])
+
+    @alive.setter
+    def alive(self, value):
+        self.store.alive[self.index] = value
+
     def calculate_impact(self, hit_point, surface_normal, target_material):
         """Calculate impact effects based on physics"""
         # Calculate angle of impact
         impact_angle = self._calculate_impact_angle(surface_normal)
-        
+
         # Calculate energy transfer based on angle and material
         energy_transfer = self._calculate_energy_transfer(impact_angle, target_material)
-        
+
         # Calculate penetration
         penetration = self._calculate_penetration(energy_transfer, target_material)
-        
+
         # Calculate final damage
         damage = self._calculate_damage(energy_transfer, penetration)
-        
+
         return {
             "damage": damage,
             "penetration": penetration,
@@ -49,19 +107,19 @@ class Projectile:
             "impact_point": hit_point,
             "impact_angle": impact_angle
         }
-    
+
     def _calculate_impact_angle(self, surface_normal):
         """Calculate angle between projectile velocity and surface normal"""
         v_norm = np.array(self.velocity) / np.linalg.norm(self.velocity)
         n_norm = np.array(surface_normal) / np.linalg.norm(surface_normal)
         cos_angle = np.dot(v_norm, n_norm)
         return math.acos(max(-1, min(1, cos_angle)))  # Clamp to prevent floating point errors
-        
+
     def _calculate_energy_transfer(self, impact_angle, target_material):
         """Calculate how much energy is transferred to the target"""
         # Angle factor: More energy transfer at perpendicular impacts
         angle_factor = abs(math.cos(impact_angle))
-        
+
         # Material factor: Different materials absorb energy differently
         material_factors = {
             "metal": 0.7,
@@ -70,9 +128,9 @@ class Projectile:
             "engine": 0.6
         }
         material_factor = material_factors.get(target_material, 0.7)
-        
+
         return self.energy * angle_factor * material_factor * self.damage_profile["energy_transfer"]
-        
+
     def _calculate_penetration(self, energy_transfer, target_material):
         """Calculate penetration depth based on energy and material"""
         material_resistance = {
@@ -82,63 +140,104 @@ class Projectile:
             "engine": 0.8
         }
         resistance = material_resistance.get(target_material, 0.7)
-        
+
         return (energy_transfer * self.damage_profile["penetration"]) / resistance
-        
+
     def _calculate_damage(self, energy_transfer, penetration):
         """Calculate final damage based on energy transfer and penetration"""
         base_damage = self.damage_profile["impact"]
         energy_factor = energy_transfer / self.energy  # Normalize to 0-1
         penetration_factor = min(1, penetration)  # Cap at 1
-        
+
         return base_damage * energy_factor * (1 + penetration_factor)
-    
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(*self.pos)
-        glColor3f(1, 1, 0)  # Default color - should be overridden by subclasses
-        glPointSize(5.0)
-        glBegin(GL_POINTS)
-        glVertex3f(0, 0, 0)
-        glEnd()
-        glPopMatrix()
-
-class PlayerProjectile(Projectile):
-    def __init__(self, pos, direction, speed=30.0):
-        damage_profile = {
-            "impact": 25,
-            "penetration": 0.7,
-            "splash": 0,
-            "energy_transfer": 0.9
-        }
-        super().__init__(pos, direction, speed, damage_profile)
-        
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(*self.pos)
-        glColor3f(1, 1, 0)  # Yellow for player projectiles
-        glPointSize(5.0)
-        glBegin(GL_POINTS)
-        glVertex3f(0, 0, 0)
-        glEnd()
-        glPopMatrix()
-
-class EnemyProjectile(Projectile):
-    def __init__(self, pos, direction, speed=20.0):
-        damage_profile = {
-            "impact": 15,
-            "penetration": 0.4,
-            "splash": 0.5,
-            "energy_transfer": 0.6
-        }
-        super().__init__(pos, direction, speed, damage_profile)
-        
-    def draw(self):
-        glPushMatrix()
-        glTranslatef(*self.pos)
-        glColor3f(1, 0, 0)  # Red for enemy projectiles
-        glPointSize(5.0)
-        glBegin(GL_POINTS)
-        glVertex3f(0, 0, 0)
-        glEnd()
-        glPopMatrix() 
\ No newline at end of file
+
+class ProjectileStore:
+    """Every live projectile, player and enemy alike, in NumPy arrays advanced together by update()"""
+    def __init__(self, capacity=256):
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 3))
+        self.prev_pos = np.zeros((capacity, 3))
+        self.velocity = np.zeros((capacity, 3))
+        self.origin = np.zeros((capacity, 3))
+        self.owner = np.zeros(capacity, dtype=np.int32)
+        self.type = np.zeros(capacity, dtype=np.int8)
+        self.radius = np.zeros(capacity)
+        self.profile = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _arrays(self):
+        return (self.pos, self.prev_pos, self.velocity, self.origin, self.owner,
+                self.type, self.radius, self.profile, self.alive)
+
+    def _grow(self):
+        old = self._arrays()
+        self._allocate(self.capacity * 2)
+        for new_array, old_array in zip(self._arrays(), old):
+            new_array[:self.count] = old_array[:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, pos, direction, projectile_type, owner, speed=None, profile=None, radius=0.2):
+        """Add one projectile and return a handle to it"""
+        if self.count == self.capacity:
+            self._grow()
+        type_info = PROJECTILE_TYPES[projectile_type]
+        speed = type_info["speed"] if speed is None else speed
+
+        # Normalize direction
+        direction = np.asarray(direction, dtype=np.float64)
+        length = np.sqrt(np.dot(direction, direction))
+
+        i = self.count
+        self.pos[i] = pos
+        self.prev_pos[i] = pos
+        self.velocity[i] = direction * speed / length
+        self.origin[i] = pos
+        self.owner[i] = owner
+        self.type[i] = projectile_type
+        self.radius[i] = radius
+        self.profile[i] = type_info["profile"] if profile is None else profile
+        self.alive[i] = True
+        self.count += 1
+        return Projectile(self, i)
+
+    def get(self, index):
+        return Projectile(self, index)
+
+    def indices(self, projectile_type=None, owner=None):
+        """Slots of live projectiles, optionally filtered by type and owner"""
+        n = self.count
+        mask = self.alive[:n].copy()
+        if projectile_type is not None:
+            mask &= self.type[:n] == projectile_type
+        if owner is not None:
+            mask &= self.owner[:n] == owner
+        return np.flatnonzero(mask)
+
+    def kill_owner(self, owner):
+        n = self.count
+        self.alive[:n] &= self.owner[:n] != owner
+
+    def clear(self, owner=None):
+        if owner is None:
+            self.count = 0
+        else:
+            self.kill_owner(owner)
+
+    def update(self, dt):
+        n = self.count
+        # Keep where each projectile started so hits can test its whole path
+        self.prev_pos[:n] = self.pos[:n]
+        self.pos[:n] += self.velocity[:n] * dt
+
+        # Remove projectiles that are dead or too far from where they were fired
+        travelled = np.abs(self.pos[:n, ::2] - self.origin[:n, ::2])
+        in_range = np.all(travelled < TYPE_RANGES[self.type[:n], None], axis=1)
+        keep = self.alive[:n] & in_range
+        if not keep.all():
+            self.count = compact(self._arrays(), keep)
@@ -0,0 +1,97 @@
+from OpenGL.GL import *
+import numpy as np
+from gl_resources import gl_resources
+
+def set_overlay_blend():
+    """Enable alpha blending for 2D overlays.
+
+    Separate alpha keeps offscreen layers premultiplied; on screen it is
+    plain alpha blending.
+    """
+    glEnable(GL_BLEND)
+    glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+class RenderTarget:
+    """An offscreen RGBA texture that 2D layers can be drawn into and reused.
+
+    bind() and unbind() redirect drawing into it; begin() and end() set up
+    sampling it, so it can be an OverlayBatch material. Contents are kept
+    with premultiplied alpha, so blending into it has to use
+    set_overlay_blend(), and it is composited with (GL_ONE,
+    GL_ONE_MINUS_SRC_ALPHA). If framebuffer objects are unavailable,
+    `available` turns False and callers should draw directly instead.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.texture = None
+        self.framebuffer = None
+        self.available = True
+        self.previous_framebuffer = 0
+        self.previous_viewport = None
+
+    def _ensure(self):
+        if self.framebuffer is not None or not self.available:
+            return
+        try:
+            self.texture = gl_resources.texture(self.width * self.height * 4)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, None)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+
+            previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+            self.framebuffer = glGenFramebuffers(1)
+            glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+            glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture, 0)
+            complete = glCheckFramebufferStatus(GL_FRAMEBUFFER) == GL_FRAMEBUFFER_COMPLETE
+            glBindFramebuffer(GL_FRAMEBUFFER, previous)
+            if not complete:
+                raise RuntimeError("framebuffer incomplete")
+        except Exception as e:
+            print(f"Offscreen render target unavailable, drawing directly: {str(e)}")
+            self.cleanup()
+            self.available = False
+
+    def bind(self):
+        """Redirect drawing into the target and clear it; returns False if unavailable"""
+        self._ensure()
+        if not self.available:
+            return False
+        self.previous_framebuffer = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        self.previous_viewport = glGetIntegerv(GL_VIEWPORT)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glViewport(0, 0, self.width, self.height)
+        glClearColor(0, 0, 0, 0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        return True
+
+    def unbind(self):
+        glBindFramebuffer(GL_FRAMEBUFFER, self.previous_framebuffer)
+        glViewport(*self.previous_viewport)
+
+    def begin(self):
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+    def end(self):
+        glDisable(GL_BLEND)
+        glDisable(GL_TEXTURE_2D)
+
+    def draw(self, batch, layer=0):
+        """Queue the target to be composited over the screen as one quad"""
+        # Texture rows run bottom-up, screen rows here top-down
+        quad = np.array([(0, 0, 0, 1), (self.width, 0, 1, 1),
+                         (self.width, self.height, 1, 0), (0, self.height, 0, 0)], dtype=np.float32)
+        batch.textured(quad, 0, 0, (1, 1, 1, 1), self, layer)
+
+    def cleanup(self):
+        if self.framebuffer is not None:
+            glDeleteFramebuffers(1, [self.framebuffer])
+            self.framebuffer = None
+        if self.texture is not None:
+            gl_resources.delete(("texture", self.texture))
+            self.texture = None
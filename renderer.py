@@ -0,0 +1,175 @@
+import configparser
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from frustum import Frustum, cull_counts
+from gl_batch import CubeBatch, PointBatch, draw_calls
+from hud import HudRenderer
+from lod import LevelOfDetail
+from projectile import PROJECTILE_TYPES
+from static_world import StaticWorld
+from tracing import tracer
+
+LOD_PARTS, LOD_CUBE, LOD_POINT = range(3)
+
+def lerp(prev, current, alpha):
+    """Blend a position from the previous tick toward the current one"""
+    return [p + (c - p) * alpha for p, c in zip(prev, current)]
+
+def enemy_impostor(enemy):
+    """Cube standing in for a distant enemy: (center offset, size, color).
+
+    The cube spans the live parts' bounds and takes their volume-weighted
+    color, so damage still shows as a darker tint.
+    """
+    parts = [part for part in enemy.parts if part.alive]
+    low = [min(part.box_min[axis] for part in parts) for axis in range(3)]
+    high = [max(part.box_max[axis] for part in parts) for axis in range(3)]
+    volume = sum(part.size ** 3 for part in parts)
+    color = [sum(part.size ** 3 * part.color[channel] for part in parts) / volume for channel in range(3)]
+    center = [(l + h) / 2 for l, h in zip(low, high)]
+    return center, max(h - l for l, h in zip(low, high)), color
+
+def apply_camera(player, alpha=1.0):
+    # Only the position is interpolated; the latest view angles keep mouse look responsive
+    pos = lerp(player.prev_pos, player.pos, alpha)
+    glRotatef(-player.rot[0], 1, 0, 0)
+    glRotatef(-player.rot[1], 0, 1, 0)
+    glTranslatef(-pos[0], -pos[1], -pos[2])
+
+class GameRenderer:
+    """Draws a GameState with OpenGL. Needs a current GL context."""
+    def __init__(self, screen_width, screen_height, show_perf=False):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.aspect_ratio = screen_width / screen_height
+        self.near_clip = 0.1
+        self.far_clip = 100.0
+        self.point_batch = PointBatch()
+        self.cube_batch = CubeBatch()
+        self.world = StaticWorld.from_settings()
+        self.hud = HudRenderer(screen_width, screen_height, show_perf)
+        self.stats = None  # Optional FrameStats timing the 3D and 2D passes
+        self.particle_radius = 0.25  # World-space slack so big point sprites don't pop at the edges
+
+        # Enemies beyond these distances are drawn as one cube, then as one point
+        config = configparser.ConfigParser()
+        config.read('settings.cfg')
+        cube_distance = float(config.get('LOD', 'cube_distance', fallback='20'))
+        point_distance = float(config.get('LOD', 'point_distance', fallback='45'))
+        hysteresis = float(config.get('LOD', 'hysteresis', fallback='2'))
+        self.enemy_lod = LevelOfDetail([cube_distance, point_distance], hysteresis)
+        self.lod_counts = np.zeros(3, dtype=np.int64)  # Visible enemies at each level last frame
+
+    def draw_enemies(self, enemy_manager, frustum, alpha=1.0):
+        enemies = [enemy for enemy in enemy_manager.enemies if enemy.alive]
+        if not enemies:
+            return
+        prev = np.array([enemy.prev_pos for enemy in enemies])
+        centers = prev + (np.array([enemy.pos for enemy in enemies]) - prev) * alpha
+        visible = frustum.spheres_visible(centers, np.array([enemy.radius for enemy in enemies]))
+        cull_counts.add("enemies", int(visible.sum()), len(enemies) - int(visible.sum()))
+        distances = np.linalg.norm(centers - frustum.position, axis=1)
+        levels = self.enemy_lod.select([enemy.id for enemy in enemies], distances)
+
+        # Full enemies as their parts and mid-range ones as one cube, in one instanced draw
+        cubes = []
+        points = []
+        pixels_per_unit = self.screen_height / (2 * frustum.tan_y)  # At distance 1
+        for i in np.flatnonzero(visible):
+            x, y, z = centers[i]
+            if levels[i] == LOD_PARTS:
+                for part in enemies[i].parts:
+                    if part.alive:
+                        rx, ry, rz = part.relative_pos
+                        r, g, b = part.color
+                        cubes.append((x + rx, y + ry, z + rz, part.size, r, g, b))
+                continue
+            (rx, ry, rz), size, (r, g, b) = enemy_impostor(enemies[i])
+            if levels[i] == LOD_CUBE:
+                cubes.append((x + rx, y + ry, z + rz, size, r, g, b))
+            else:
+                # Sized to the pixels the cube would cover
+                pixels = size / distances[i] * pixels_per_unit
+                points.append((x + rx, y + ry, z + rz, r, g, b, max(pixels, 2.0)))
+        self.lod_counts = np.bincount(levels[visible], minlength=3)
+        if cubes:
+            cubes = np.array(cubes, dtype=np.float32)
+            self.cube_batch.draw(cubes[:, 0:3], cubes[:, 3], cubes[:, 4:7])
+        if points:
+            points = np.array(points, dtype=np.float32)
+            colors = np.ones((len(points), 4), dtype=np.float32)
+            colors[:, 0:3] = points[:, 3:6]
+            self.point_batch.draw(points[:, 0:3], colors, points[:, 6], blend=None)
+
+    def draw_projectiles(self, projectiles, frustum, alpha=1.0):
+        # One point draw per projectile type, with no per-projectile state changes
+        n = projectiles.count
+        prev = projectiles.prev_pos[:n]
+        positions = prev + (projectiles.pos[:n] - prev) * alpha
+        alive = projectiles.alive[:n]
+        visible = alive & frustum.spheres_visible(positions, projectiles.radius[:n])
+        drawn = int(visible.sum())
+        cull_counts.add("projectiles", drawn, int(alive.sum()) - drawn)
+        live_types = np.where(visible, projectiles.type[:n], -1)
+        for projectile_type, info in enumerate(PROJECTILE_TYPES):
+            self.point_batch.draw(positions[live_types == projectile_type],
+                                  (*info["color"], 1), info["size"], blend=None)
+
+    def draw_particles(self, particle_system, frustum, alpha=1.0):
+        tracer.begin("GameRenderer.draw_particles")
+        # One draw call per non-empty blend group, regardless of particle count
+        for blend, store in particle_system.layers.items():
+            n = store.count
+            prev = store.prev_pos[:n]
+            positions = prev + (store.pos[:n] - prev) * np.float32(alpha)
+            visible = frustum.spheres_visible(positions, self.particle_radius)
+            drawn = int(visible.sum())
+            cull_counts.add("particles", drawn, n - drawn)
+            if drawn < n:
+                positions = positions[visible]
+                colors, sizes = store.color[:n][visible], store.size[:n][visible]
+            else:
+                colors, sizes = store.color[:n], store.size[:n]
+            self.point_batch.draw(positions, colors, sizes, blend)
+        tracer.end("GameRenderer.draw_particles")
+
+    def draw(self, game_state, fps, alpha=1.0):
+        """Draw the scene `alpha` of the way from the previous tick to the latest one"""
+        tracer.begin("GameRenderer.draw")
+        draw_calls.end_frame()
+        cull_counts.end_frame()
+        player = game_state.player
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glLoadIdentity()
+        fov = player.get_current_fov()
+        gluPerspective(fov, self.aspect_ratio, self.near_clip, self.far_clip)
+
+        apply_camera(player, alpha)
+        frustum = Frustum(lerp(player.prev_pos, player.pos, alpha), player.rot, fov,
+                          self.aspect_ratio, self.near_clip, self.far_clip)
+
+        # Enable depth testing
+        glEnable(GL_DEPTH_TEST)
+
+        # Draw 3D scene
+        self.world.draw(frustum)
+        self.draw_enemies(game_state.enemy_manager, frustum, alpha)
+        # Projectiles and particles go after all opaque geometry
+        self.draw_projectiles(game_state.projectiles, frustum, alpha)
+        self.draw_particles(game_state.particle_system, frustum, alpha)
+        if self.stats is not None:
+            self.stats.lap("draw_3d")
+
+        # Draw 2D overlays
+        glDisable(GL_DEPTH_TEST)
+        self.hud.draw(game_state, fps, self.stats)
+        if self.stats is not None:
+            self.stats.lap("draw_2d")
+        tracer.end("GameRenderer.draw")
+
+    def cleanup(self):
+        self.point_batch.cleanup()
+        self.cube_batch.cleanup()
+        self.world.cleanup()
+        self.hud.cleanup()
@@ -0,0 +1,160 @@
+"""Deterministic gameplay scenarios for checking simulation changes.
+
+Each scenario seeds `random`, scripts the player's aim and replays a fixed
+number of ticks, recording a trace that two implementations can be compared
+on. Run `python scenarios.py` to replay them all and report any mismatch.
+"""
+import math
+import random
+import sys
+from enemy import Enemy, EnemyManager
+from player import Player
+from projectile import TYPE_ENEMY, ProjectileStore
+
+def aim_at(player, target):
+    """Point the player's view at a world position"""
+    dx = target[0] - player.pos[0]
+    dy = target[1] - player.pos[1]
+    dz = target[2] - player.pos[2]
+    player.rot[1] = math.degrees(math.atan2(-dx, -dz))
+    player.rot[0] = math.degrees(math.atan2(dy, math.sqrt(dx*dx + dz*dz)))
+
+def build_arena(enemy_count, seed):
+    """Seed `random` and return (projectiles, player, manager) with `enemy_count` enemies spawned"""
+    random.seed(seed)
+    projectiles = ProjectileStore()
+    player = Player(projectiles)
+    player.health = player.max_health = 1e9  # Keep the player alive throughout
+    manager = EnemyManager(projectiles)
+    manager.max_enemies = enemy_count
+    for _ in range(enemy_count):
+        manager.spawn_enemy()
+    return projectiles, player, manager
+
+def run_collision_scenario(batched, broadphase=True, seed=1234, ticks=900, dt=1/60, enemy_count=5):
+    """Fire at a group of enemies and trace every hit and part's health"""
+    projectiles, player, manager = build_arena(enemy_count, seed)
+    player.shot_cooldown = 0.05
+    manager.batched_collisions = batched
+    if not broadphase:
+        manager.broadphase = None
+
+    trace = []
+    current_time = 0
+    for tick in range(ticks):
+        current_time += dt
+        if manager.enemies:
+            # Aim near a random part of a random enemy
+            enemy = random.choice(manager.enemies)
+            part = random.choice(enemy.parts)
+            aim_at(player, [enemy.pos[i] + part.relative_pos[i] + random.uniform(-0.4, 0.4)
+                            for i in range(3)])
+            player.shoot(current_time)
+
+        hit_pos = manager.update(dt, current_time, player)
+        manager.cleanup()
+        trace.append((
+            tick,
+            None if hit_pos is None else tuple(float(c) for c in hit_pos),
+            tuple((enemy.id, tuple(part.health for part in enemy.parts)) for enemy in manager.enemies),
+            player.health,
+            len(projectiles),
+        ))
+    return trace
+
+def compare_traces(name, expected, actual):
+    for expected_tick, actual_tick in zip(expected, actual):
+        if expected_tick != actual_tick:
+            print(f"{name}: mismatch at tick {expected_tick[0]}")
+            print(f"  expected: {expected_tick}")
+            print(f"  actual:   {actual_tick}")
+            return False
+    if len(expected) != len(actual):
+        print(f"{name}: trace lengths differ ({len(expected)} vs {len(actual)})")
+        return False
+    hits = sum(1 for tick in expected if tick[1] is not None)
+    print(f"{name}: {len(expected)} ticks match ({hits} ticks with hits)")
+    return True
+
+def check_collision_kernel():
+    """The batched kernel must reproduce the per-part collision path"""
+    ok = True
+    for seed in (1234, 99, 7):
+        ok &= compare_traces(f"collision kernel (seed {seed})",
+                             run_collision_scenario(batched=False, broadphase=False, seed=seed),
+                             run_collision_scenario(batched=True, broadphase=False, seed=seed))
+    return ok
+
+def check_broadphase():
+    """The spatial hash must not drop any pair the all-pairs test finds"""
+    ok = True
+    for seed in (1234, 99, 7):
+        expected = run_collision_scenario(batched=False, broadphase=False, seed=seed)
+        ok &= compare_traces(f"broadphase, per-part (seed {seed})", expected,
+                             run_collision_scenario(batched=False, broadphase=True, seed=seed))
+        ok &= compare_traces(f"broadphase, kernel (seed {seed})", expected,
+                             run_collision_scenario(batched=True, broadphase=True, seed=seed))
+    return ok
+
+def run_thin_target_scenario(tick_rate, batched=True, shots=20):
+    """Fire at a parked enemy's thin weapon part and at the player at one tick rate.
+
+    Returns (enemy hits, player hits); every shot should connect.
+    """
+    dt = 1 / tick_rate
+    projectiles, player, manager = build_arena(0, seed=0)
+    player.pos = [12, 0, 0]  # Side-on to the 0.4-wide right weapon
+    manager.max_enemies = 1
+    manager.batched_collisions = batched
+    enemy = Enemy([0, 0, 0], projectiles, 0)
+    enemy.parts[2].health = enemy.parts[2].max_health = 1e9  # Keep the weapon intact
+    enemy.speed = 0
+    enemy.shot_cooldown = math.inf  # Scripted shots only
+    manager.enemies.append(enemy)
+
+    enemy_hits = 0
+    player_hits = 0
+    current_time = 0
+    for shot in range(shots):
+        # Through the weapon's thin side from the player, and at the player
+        # from 20 units away (dipping, as level shots deal no damage to it)
+        player.last_shot_time = -math.inf
+        aim_at(player, [0.6, 0, 0])
+        player.shoot(current_time)
+        origin = [player.pos[0], 5, player.pos[2] - 20]
+        projectiles.spawn(origin, [player.pos[i] - origin[i] for i in range(3)], TYPE_ENEMY, enemy.id)
+
+        weapon_health = enemy.parts[2].health
+        player_health = player.health
+        # Fly until both shots have resolved
+        for tick in range(int(2 * tick_rate)):
+            current_time += dt
+            manager.update(dt, current_time, player)
+        enemy_hits += enemy.parts[2].health < weapon_health
+        player_hits += player.health < player_health
+    return enemy_hits, player_hits
+
+def check_swept_collisions():
+    """Swept tests must not lose hits on thin targets at low tick rates"""
+    ok = True
+    shots = 20
+    for tick_rate in (60, 30, 15, 10, 5):
+        for batched in (True, False):
+            enemy_hits, player_hits = run_thin_target_scenario(tick_rate, batched, shots)
+            path = "kernel" if batched else "per-part"
+            passed = enemy_hits == shots and player_hits == shots
+            print(f"thin targets at {tick_rate} Hz ({path}): "
+                  f"{enemy_hits}/{shots} weapon hits, {player_hits}/{shots} player hits"
+                  + ("" if passed else " FAILED"))
+            ok &= passed
+    return ok
+
+SCENARIOS = [
+    check_collision_kernel,
+    check_broadphase,
+    check_swept_collisions,
+]
+
+if __name__ == "__main__":
+    results = [scenario() for scenario in SCENARIOS]
+    sys.exit(0 if all(results) else 1)
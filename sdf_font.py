@@ -0,0 +1,217 @@
+import numpy as np
+import pygame
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+from gl_resources import gl_resources
+from render_target import set_overlay_blend
+
+# Glyphs are rasterized once at this size; every other size is a scaled quad
+SDF_BASE_SIZE = 64
+SDF_SPREAD = 8  # Pixels of distance encoded either side of a glyph's edge
+SDF_CHARS = "".join(chr(c) for c in range(32, 127))
+SDF_ATLAS_WIDTH = 1024
+SDF_CACHE_VERSION = 1
+
+SDF_VERTEX_SHADER = """
+#version 120
+void main() {
+    gl_Position = ftransform();
+    gl_FrontColor = gl_Color;
+    gl_TexCoord[0] = gl_MultiTexCoord0;
+}
+"""
+
+SDF_FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D atlas;
+void main() {
+    float distance = texture2D(atlas, gl_TexCoord[0].st).a;
+    float smoothing = fwidth(distance);
+    float alpha = smoothstep(0.5 - smoothing, 0.5 + smoothing, distance);
+    gl_FragColor = vec4(gl_Color.rgb, gl_Color.a * alpha);
+}
+"""
+
+def signed_distance_field(inside, spread):
+    """Distance field of a glyph mask, grown by `spread` pixels on each side.
+
+    Each texel holds 0.5 on the glyph's edge, rising toward 1 inside and
+    falling toward 0 outside, reaching the ends `spread` pixels away.
+    """
+    grown = np.pad(inside, spread)
+    height, width = grown.shape
+    search = np.pad(grown, spread)
+    to_inside = np.full(grown.shape, np.inf, dtype=np.float32)
+    to_outside = np.full(grown.shape, np.inf, dtype=np.float32)
+    for dy in range(-spread, spread + 1):
+        for dx in range(-spread, spread + 1):
+            distance = np.float32(np.hypot(dx, dy))
+            if distance > spread:
+                continue
+            shifted = search[spread + dy:spread + dy + height, spread + dx:spread + dx + width]
+            np.minimum(to_inside, np.where(shifted, distance, np.inf), out=to_inside)
+            np.minimum(to_outside, np.where(shifted, np.inf, distance), out=to_outside)
+    # Pixel centres sit half a pixel from the edge between them
+    signed = np.where(grown, to_outside - 0.5, 0.5 - to_inside)
+    return np.clip(0.5 + signed / (2 * spread), 0, 1)
+
+def build_sdf_atlas(base_size=SDF_BASE_SIZE, spread=SDF_SPREAD, chars=SDF_CHARS, atlas_width=SDF_ATLAS_WIDTH):
+    """Rasterize `chars` and pack their distance fields onto shelves.
+
+    Returns (atlas, rects): a (height, atlas_width) uint8 array and, per
+    character, the (x, y, width, height) of its unpadded glyph box.
+    """
+    font = pygame.font.Font(None, base_size)
+    fields = []
+    for char in chars:
+        surface = font.render(char, True, (255, 255, 255))
+        alpha = pygame.surfarray.array_alpha(surface).T
+        fields.append((char, signed_distance_field(alpha > 127, spread)))
+
+    # Shelf-pack the padded fields, tallest first
+    placements = {}
+    x = y = shelf_height = 0
+    for char, field in sorted(fields, key=lambda item: -item[1].shape[0]):
+        height, width = field.shape
+        if x + width > atlas_width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        placements[char] = (x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+    atlas_height = 1
+    while atlas_height < y + shelf_height:
+        atlas_height *= 2
+
+    atlas = np.zeros((atlas_height, atlas_width), dtype=np.uint8)
+    rects = np.zeros((len(chars), 4), dtype=np.int32)
+    for i, (char, field) in enumerate(fields):
+        x, y = placements[char]
+        height, width = field.shape
+        atlas[y:y + height, x:x + width] = np.round(field * 255)
+        rects[i] = (x + spread, y + spread, width - 2 * spread, height - 2 * spread)
+    return atlas, rects
+
+def load_sdf_atlas(cache_path=None):
+    """Load the distance-field atlas from `cache_path`, building and saving it if needed"""
+    params = np.array([SDF_BASE_SIZE, SDF_SPREAD, SDF_CACHE_VERSION])
+    codepoints = np.array([ord(c) for c in SDF_CHARS])
+    if cache_path:
+        try:
+            with np.load(cache_path) as cached:
+                if np.array_equal(cached["params"], params) and np.array_equal(cached["codepoints"], codepoints):
+                    return cached["atlas"], cached["rects"]
+        except (OSError, KeyError, ValueError):
+            pass
+
+    print("Building SDF font atlas...")
+    atlas, rects = build_sdf_atlas()
+    if cache_path:
+        try:
+            with open(cache_path, "wb") as f:
+                np.savez_compressed(f, atlas=atlas, rects=rects, params=params, codepoints=codepoints)
+        except OSError as e:
+            print(f"Could not cache SDF font atlas to {cache_path}: {str(e)}")
+    return atlas, rects
+
+class SdfFont:
+    """Distance-field glyphs drawn at any size from one texture.
+
+    Drop-in for GlyphAtlas in TextRenderer. The shader thresholds the
+    distance at 0.5 with a one-texel smooth edge; without shaders, alpha
+    testing gives hard but still scalable edges.
+    """
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.texture = None
+        self.program = None
+        self.shader_failed = False
+        self.atlas_size = (0, 0)
+        self.rects = {}
+        self.glyphs = {}  # (char, font_size) -> glyph info
+        self.on_evict = None  # Sizes are never evicted; kept for GlyphAtlas parity
+
+    def _ensure_texture(self):
+        if self.texture is not None:
+            return
+        atlas, rects = load_sdf_atlas(self.cache_path)
+        self.atlas_size = (atlas.shape[1], atlas.shape[0])
+        self.rects = {char: tuple(int(v) for v in rect) for char, rect in zip(SDF_CHARS, rects)}
+
+        # White texels carrying the distance in alpha, so glColor tints the text
+        texels = np.full(atlas.shape + (4,), 255, dtype=np.uint8)
+        texels[..., 3] = atlas
+        self.texture = gl_resources.texture(texels.nbytes)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, atlas.shape[1], atlas.shape[0], 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, texels)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+    def _ensure_program(self):
+        if self.program is not None or self.shader_failed:
+            return
+        try:
+            self.program = shaders.compileProgram(
+                shaders.compileShader(SDF_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(SDF_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+        except Exception as e:
+            print(f"SDF text shader unavailable, using alpha test: {str(e)}")
+            self.shader_failed = True
+
+    def touch(self, font_size):
+        pass
+
+    def glyph(self, char, font_size):
+        """Glyph info scaled to `font_size`, or None for characters not in the atlas"""
+        glyph = self.glyphs.get((char, font_size))
+        if glyph is not None:
+            return glyph
+        self._ensure_texture()
+        rect = self.rects.get(char)
+        if rect is None:
+            return None
+        x, y, width, height = rect
+        atlas_width, atlas_height = self.atlas_size
+        scale = font_size / SDF_BASE_SIZE
+        glyph = {
+            'width': round(width * scale),
+            'height': round(height * scale),
+            # The quad covers the spread margin so edges can fade out
+            'pad': SDF_SPREAD * scale,
+            'u1': (x - SDF_SPREAD) / atlas_width,
+            'v1': (y - SDF_SPREAD) / atlas_height,
+            'u2': (x + width + SDF_SPREAD) / atlas_width,
+            'v2': (y + height + SDF_SPREAD) / atlas_height,
+        }
+        self.glyphs[(char, font_size)] = glyph
+        return glyph
+
+    def begin(self):
+        """Set up texture and shader state for drawing text"""
+        self._ensure_texture()
+        self._ensure_program()
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        set_overlay_blend()
+        if self.program is not None:
+            glUseProgram(self.program)
+        else:
+            glEnable(GL_ALPHA_TEST)
+            glAlphaFunc(GL_GREATER, 0.5)
+
+    def end(self):
+        if self.program is not None:
+            glUseProgram(0)
+        else:
+            glDisable(GL_ALPHA_TEST)
+        glDisable(GL_BLEND)
+        glDisable(GL_TEXTURE_2D)
+
+    def cleanup(self):
+        if self.texture is not None:
+            gl_resources.delete(("texture", self.texture))
+            self.texture = None
+        if self.program is not None:
+            glDeleteProgram(self.program)
+            self.program = None
+        self.glyphs = {}
@@ -0,0 +1,18 @@
+import numpy as np
+
+def compact(arrays, keep):
+    """Pack the rows flagged in `keep` into the front of every array, in place.
+
+    `keep` covers the first len(keep) rows, the store's current count.
+    Only kept rows past the new end move, each into a dropped row before
+    it, so row order is not preserved. Returns the new count. Allocates
+    index arrays sized by the number of rows moved.
+    """
+    n = len(keep)
+    k = int(np.count_nonzero(keep))
+    # Kept rows past the new end fill the dropped rows before it
+    holes = np.flatnonzero(~keep[:k])
+    movers = np.flatnonzero(keep[k:n]) + k
+    for array in arrays:
+        array[holes] = array[movers]
+    return k
@@ -0,0 +1,51 @@
+import numpy as np
+
+# Neighbourhood offsets (dx, dz) searched around each query cell
+NEIGHBOUR_OFFSETS = np.array([(dx, dz) for dx in (-1, 0, 1) for dz in (-1, 0, 1)], dtype=np.int64)
+
+def concat_ranges(starts, counts):
+    """Concatenate [start, start + count) ranges without a Python loop"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+class SpatialHash:
+    """Uniform grid over the XZ plane for finding nearby pairs.
+
+    Items are bucketed by the cell their position falls in; a query returns
+    the items in the same or one of the eight neighbouring cells. Any pair
+    closer than `cell_size` on the XZ plane is therefore always reported.
+    The grid is a sorted array of cell keys, rebuilt each tick in a few
+    vectorized ops.
+    """
+    def __init__(self, cell_size=4.0):
+        self.cell_size = cell_size
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.int64)
+
+    def _cells(self, positions):
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        return np.floor(positions[:, ::2] / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _keys(cells):
+        # Pack (x, z) cell coordinates into one sortable integer
+        return cells[..., 0] * (1 << 32) + cells[..., 1]
+
+    def build(self, positions, items=None):
+        """Bucket `items` (default: 0..n-1) by the cells of their positions"""
+        keys = self._keys(self._cells(positions))
+        order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[order]
+        self.order = order if items is None else np.asarray(items)[order]
+
+    def query(self, positions):
+        """Return (query indices, items) for every item near each query point"""
+        cells = self._cells(positions)
+        keys = self._keys(cells[:, None, :] + NEIGHBOUR_OFFSETS[None, :, :]).ravel()
+        starts = np.searchsorted(self.sorted_keys, keys, side="left")
+        counts = np.searchsorted(self.sorted_keys, keys, side="right") - starts
+        query_idx = np.repeat(np.repeat(np.arange(len(cells)), len(NEIGHBOUR_OFFSETS)), counts)
+        return query_idx, self.order[concat_ranges(starts, counts)]
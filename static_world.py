@@ -0,0 +1,160 @@
+import configparser
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from frustum import cull_counts
+from gl_batch import UNIT_CUBE, draw_calls
+from gl_resources import gl_resources
+
+# Brightness baked into each face of UNIT_CUBE (front, back, top, bottom, right, left) so blocks read as solid
+FACE_SHADES = np.repeat(np.array([0.8, 0.8, 1.0, 0.5, 0.65, 0.65], dtype=np.float32), 4)
+
+def load_blocks(path):
+    """Read blocks from a text file: one `x y z width height depth r g b` per line, centred on x, y, z"""
+    data = np.loadtxt(path, dtype=np.float32, comments="#", ndmin=2)
+    if data.shape[1] != 9:
+        raise ValueError(f"expected 9 values per block, found {data.shape[1]}")
+    return data[:, 0:3], data[:, 3:6], data[:, 6:9]
+
+def generate_blocks(count, floor_size, floor_y, clear_radius, seed=None):
+    """Scatter `count` grey blocks on the floor, leaving a clear circle around the origin"""
+    rng = np.random.default_rng(seed)
+    sizes = rng.uniform((1, 1, 1), (4, 5, 4), size=(count, 3)).astype(np.float32)
+    # Polar placement keeps every block outside the clear circle and on the floor
+    angle = rng.uniform(0, 2 * np.pi, count)
+    distance = rng.uniform(clear_radius, floor_size - 2, count)
+    centers = np.empty((count, 3), dtype=np.float32)
+    centers[:, 0] = np.clip(distance * np.cos(angle), -floor_size + 2, floor_size - 2)
+    centers[:, 1] = floor_y + sizes[:, 1] / 2
+    centers[:, 2] = np.clip(distance * np.sin(angle), -floor_size + 2, floor_size - 2)
+    colors = (rng.uniform(0.35, 0.65, size=(count, 1)) * rng.uniform(0.9, 1.1, size=(count, 3))).astype(np.float32)
+    return centers, sizes, colors
+
+class StaticWorld:
+    """The level's fixed geometry: the floor and any number of blocks.
+
+    Geometry is compiled once into a single static vertex buffer, sorted
+    into square chunks on the XZ plane. Each frame the chunks' bounding
+    spheres are tested against the view frustum in one vectorized pass
+    and the survivors are drawn with one glMultiDrawArrays, so the cost in
+    Python does not grow with the number of blocks.
+    """
+    STRIDE = 6 * 4
+
+    def __init__(self, centers, sizes, colors, floor_size=50, floor_y=-2, floor_color=(0.5, 0.5, 0.5), chunk_size=16):
+        self.centers = np.asarray(centers, dtype=np.float32).reshape(-1, 3)
+        self.sizes = np.asarray(sizes, dtype=np.float32).reshape(-1, 3)
+        self.colors = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+        self.floor_size = floor_size
+        self.floor_y = floor_y
+        self.floor_color = floor_color
+        self.chunk_size = chunk_size
+        self.buffer = None
+        self.chunk_first = None  # First vertex of each chunk in the buffer
+        self.chunk_count = None  # Vertices in each chunk
+        self.chunk_centers = None
+        self.chunk_radii = None
+        self.visible_chunks = 0  # Chunks drawn last frame
+
+    @classmethod
+    def from_settings(cls, path='settings.cfg'):
+        """Load the [World] level file, or generate blocks if none is set or it can't be read"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        floor_size = float(config.get('World', 'floor_size', fallback='50'))
+        floor_y = float(config.get('World', 'floor_y', fallback='-2'))
+        chunk_size = float(config.get('World', 'chunk_size', fallback='16'))
+        level_file = config.get('World', 'level_file', fallback='').strip()
+        blocks = None
+        if level_file:
+            try:
+                blocks = load_blocks(level_file)
+            except (OSError, ValueError) as e:
+                print(f"Could not load level {level_file}, generating one: {str(e)}")
+        if blocks is None:
+            count = int(config.get('World', 'blocks', fallback='200'))
+            seed = config.get('World', 'seed', fallback='').strip()
+            clear_radius = float(config.get('World', 'clear_radius', fallback='22'))
+            blocks = generate_blocks(count, floor_size, floor_y, clear_radius, int(seed) if seed else None)
+        return cls(*blocks, floor_size=floor_size, floor_y=floor_y, chunk_size=chunk_size)
+
+    def _build(self):
+        """Expand every block and floor tile into shaded quads, grouped by chunk"""
+        size = self.floor_size
+        tiles = max(1, int(np.ceil(2 * size / self.chunk_size)))
+        step = 2 * size / tiles
+
+        # One floor tile per chunk, so the floor is culled along with everything else
+        edges = -size + step * np.arange(tiles + 1)
+        tx, tz = np.meshgrid(np.arange(tiles), np.arange(tiles), indexing="ij")
+        tx, tz = tx.ravel(), tz.ravel()
+        floor = np.empty((len(tx), 4, 6), dtype=np.float32)
+        floor[:, :, 1] = self.floor_y
+        floor[:, :, 0] = np.stack([edges[tx], edges[tx + 1], edges[tx + 1], edges[tx]], axis=1)
+        floor[:, :, 2] = np.stack([edges[tz], edges[tz], edges[tz + 1], edges[tz + 1]], axis=1)
+        floor[:, :, 3:6] = self.floor_color
+        floor_chunk = tx * tiles + tz
+
+        blocks = np.empty((len(self.centers), len(UNIT_CUBE), 6), dtype=np.float32)
+        blocks[:, :, 0:3] = UNIT_CUBE * self.sizes[:, None, :] + self.centers[:, None, :]
+        blocks[:, :, 3:6] = self.colors[:, None, :] * FACE_SHADES[None, :, None]
+        cells = np.clip(((self.centers[:, [0, 2]] + size) // step).astype(np.int64), 0, tiles - 1)
+        block_chunk = cells[:, 0] * tiles + cells[:, 1]
+
+        # Sort all quads by chunk so each chunk is one contiguous range
+        quads = np.concatenate([floor.reshape(-1, 4, 6),
+                                blocks.reshape(-1, 4, 6)])
+        quad_chunk = np.concatenate([floor_chunk, np.repeat(block_chunk, len(UNIT_CUBE) // 4)])
+        order = np.argsort(quad_chunk, kind="stable")
+        vertices = quads[order].reshape(-1, 6)
+        counts = np.bincount(quad_chunk, minlength=tiles * tiles) * 4
+
+        # Bounding spheres from each chunk's actual vertices
+        chunk_of_vertex = np.repeat(np.arange(tiles * tiles), counts)
+        low = np.full((tiles * tiles, 3), np.inf, dtype=np.float32)
+        high = np.full((tiles * tiles, 3), -np.inf, dtype=np.float32)
+        np.minimum.at(low, chunk_of_vertex, vertices[:, 0:3])
+        np.maximum.at(high, chunk_of_vertex, vertices[:, 0:3])
+
+        keep = counts > 0
+        self.chunk_count = counts[keep].astype(np.int32)
+        self.chunk_first = (np.cumsum(counts) - counts)[keep].astype(np.int32)
+        self.chunk_centers = ((low + high) / 2)[keep]
+        self.chunk_radii = (np.linalg.norm(high - low, axis=1) / 2)[keep]
+        return vertices
+
+    def _ensure_buffer(self):
+        if self.buffer is not None:
+            return
+        vertices = self._build()
+        self.buffer = gl_resources.buffer(vertices.nbytes)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self, frustum):
+        """Draw the chunks that reach inside `frustum`"""
+        self._ensure_buffer()
+        visible = frustum.spheres_visible(self.chunk_centers, self.chunk_radii)
+        self.visible_chunks = int(visible.sum())
+        cull_counts.add("chunks", self.visible_chunks, len(visible) - self.visible_chunks)
+        if self.visible_chunks == 0:
+            return
+        first = self.chunk_first[visible]
+        count = self.chunk_count[visible]
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, self.STRIDE, ctypes.c_void_p(0))
+        glColorPointer(3, GL_FLOAT, self.STRIDE, ctypes.c_void_p(12))
+        glMultiDrawArrays(GL_QUADS, first, count, len(first))
+        draw_calls.add()
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def cleanup(self):
+        if self.buffer is not None:
+            gl_resources.delete(("buffer", self.buffer))
+            self.buffer = None
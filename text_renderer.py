@@ -1,156 +1,115 @@
+import configparser
+from collections import OrderedDict
 import pygame
-from OpenGL.GL import *
 import numpy as np
+from gl_batch import OverlayBatch
+from glyph_atlas import GlyphAtlas
+from sdf_font import SdfFont
 
 class TextRenderer:
-    def __init__(self):
+    """Lays out and queues text; nothing is drawn until `batch` is flushed"""
+    def __init__(self, batch=None, atlas_size=1024, mode=None):
         pygame.font.init()
-        self.fonts = {}
-        self.textures = {}
-        
-    def create_font_texture(self, font_size):
-        """Create a texture atlas for a given font size"""
-        if font_size in self.textures:
-            return
-            
-        font = pygame.font.Font(None, font_size)
-        
-        # Create surfaces for all necessary characters
-        chars = "0123456789%/abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ. "
-        char_surfaces = {}
-        max_height = 0
-        total_width = 0
-        
-        for char in chars:
-            surface = font.render(char, True, (255, 255, 255))
-            char_surfaces[char] = surface
-            max_height = max(max_height, surface.get_height())
-            total_width += surface.get_width()
-        
-        # Create texture atlas
-        atlas_surface = pygame.Surface((total_width, max_height), pygame.SRCALPHA)
-        atlas_surface.fill((0, 0, 0, 0))
-        
-        # Position information for each character
-        char_data = {}
-        x_offset = 0
-        
-        for char, surface in char_surfaces.items():
-            atlas_surface.blit(surface, (x_offset, 0))
-            char_data[char] = {
-                'x': x_offset,
-                'width': surface.get_width(),
-                'height': surface.get_height()
-            }
-            x_offset += surface.get_width()
+        self.batch = batch if batch is not None else OverlayBatch()
+        # Load settings
+        config = configparser.ConfigParser()
+        config.read('settings.cfg')
+        if mode is None:
+            mode = config.get('Text', 'font_mode', fallback='bitmap').strip().lower()
+        if mode == "sdf":
+            # One distance-field atlas scaled to every size
+            sdf_cache = config.get('Text', 'sdf_cache', fallback='sdf_font.npz').strip()
+            self.atlas = SdfFont(sdf_cache or None)
+        else:
+            if mode != "bitmap":
+                print(f"Unknown font mode '{mode}', using 'bitmap'")
+                mode = "bitmap"
+            # Glyphs of every size share one lazily filled texture
+            self.atlas = GlyphAtlas(atlas_size, atlas_size)
+        self.mode = mode
+        self.atlas.on_evict = self.forget_size
+        # Laid-out strings, least recently used first
+        self.layouts = OrderedDict()
+        self.layout_cache_size = 256
 
-        # Flip the surface vertically before creating texture
-        atlas_surface = pygame.transform.flip(atlas_surface, False, True)
-        
-        # Create OpenGL texture
-        texture_data = pygame.image.tostring(atlas_surface, 'RGBA', True)
-        texture = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, atlas_surface.get_width(), atlas_surface.get_height(),
-                    0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        
-        self.textures[font_size] = {
-            'texture': texture,
-            'width': atlas_surface.get_width(),
-            'height': atlas_surface.get_height(),
-            'char_data': char_data
-        }
-    
-    def draw_text(self, text, x, y, font_size, color=(1, 1, 1, 1)):
-        """Draw text at the specified position"""
-        if font_size not in self.textures:
-            self.create_font_texture(font_size)
-            
-        atlas_data = self.textures[font_size]
-        texture = atlas_data['texture']
-        atlas_height = atlas_data['height']
-        char_data = atlas_data['char_data']
-        
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, texture)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
-        glColor4f(*color)
-        
-        current_x = x
+    def forget_size(self, font_size):
+        """Drop cached layouts that point at an evicted size's glyphs"""
+        for key in [key for key in self.layouts if key[1] == font_size]:
+            del self.layouts[key]
+
+    def layout(self, text, font_size):
+        """Lay a string out as textured quads, cached by (text, font_size).
+
+        Returns (vertices, width, height) where vertices is an (n * 4, 4)
+        float32 array of x, y, u, v relative to the text's top-left corner.
+        """
+        key = (text, font_size)
+        cached = self.layouts.get(key)
+        if cached is not None:
+            self.layouts.move_to_end(key)
+            return cached
+
+        quads = []
+        current_x = 0
+        max_height = 0
         for char in text:
-            if char not in char_data:
-                current_x += font_size // 3  # Space for unknown characters
+            glyph = self.atlas.glyph(char, font_size)
+            if glyph is None:
+                current_x += font_size // 3  # No room in the atlas; leave a gap
                 continue
-                
-            char_info = char_data[char]
-            char_width = char_info['width']
-            char_height = char_info['height']
-            char_x = char_info['x']
-            
-            # Calculate texture coordinates
-            tex_x1 = char_x / atlas_data['width']
-            tex_x2 = (char_x + char_width) / atlas_data['width']
-            
-            # Draw character quad
-            glBegin(GL_QUADS)
-            glTexCoord2f(tex_x1, 0)
-            glVertex2f(current_x, y)
-            glTexCoord2f(tex_x2, 0)
-            glVertex2f(current_x + char_width, y)
-            glTexCoord2f(tex_x2, 1)
-            glVertex2f(current_x + char_width, y + char_height)
-            glTexCoord2f(tex_x1, 1)
-            glVertex2f(current_x, y + char_height)
-            glEnd()
-            
+
+            char_width = glyph['width']
+            char_height = glyph['height']
+            pad = glyph.get('pad', 0)  # SDF quads reach past the glyph box
+            u1, v1, u2, v2 = glyph['u1'], glyph['v1'], glyph['u2'], glyph['v2']
+            quads.append((
+                (current_x - pad, -pad, u1, v1),
+                (current_x + char_width + pad, -pad, u2, v1),
+                (current_x + char_width + pad, char_height + pad, u2, v2),
+                (current_x - pad, char_height + pad, u1, v2),
+            ))
             current_x += char_width
-            
-        glDisable(GL_BLEND)
-        glDisable(GL_TEXTURE_2D)
-        
-        return current_x - x  # Return the width of the rendered text
+            max_height = max(max_height, char_height)
+
+        vertices = np.array(quads, dtype=np.float32).reshape(-1, 4)
+        cached = (vertices, current_x, max_height)
+        self.layouts[key] = cached
+        if len(self.layouts) > self.layout_cache_size:
+            self.layouts.popitem(last=False)  # Drop the least recently used
+        return cached
+
+    def draw_text(self, text, x, y, font_size, color=(1, 1, 1, 1), layer=1):
+        """Queue text at the specified position"""
+        vertices, width, _ = self.layout(text, font_size)
+        if len(vertices) == 0:
+            return width
+
+        self.atlas.touch(font_size)
+        self.batch.textured(vertices, x, y, color, self.atlas, layer)
+
+        return width  # Return the width of the rendered text
     
     def cleanup(self):
-        """Delete all textures"""
-        for atlas_data in self.textures.values():
-            glDeleteTextures([atlas_data['texture']]) 
+        """Delete the glyph atlas texture, shaders and batch buffer"""
+        self.atlas.cleanup()
+        self.batch.cleanup()
+        self.layouts.clear()
     
     def get_text_dimensions(self, text, font_size):
         """Calculate the width and height of text before rendering"""
-        if font_size not in self.textures:
-            self.create_font_texture(font_size)
-            
-        atlas_data = self.textures[font_size]
-        char_data = atlas_data['char_data']
-        
-        total_width = 0
-        max_height = 0
-        
-        for char in text:
-            if char not in char_data:
-                total_width += font_size // 3  # Space for unknown characters
-                continue
-                
-            char_info = char_data[char]
-            total_width += char_info['width']
-            max_height = max(max_height, char_info['height'])
-            
-        return total_width, max_height
+        _, width, height = self.layout(text, font_size)
+        return width, height
 
-    def draw_text_centered(self, text, center_x, center_y, font_size, color=(1, 1, 1, 1)):
+    def draw_text_centered(self, text, center_x, center_y, font_size, color=(1, 1, 1, 1), layer=1):
         """Draw text centered at the specified position"""
         width, height = self.get_text_dimensions(text, font_size)
         x = center_x - width // 2
         y = center_y - height // 2
-        return self.draw_text(text, x, y, font_size, color)
+        return self.draw_text(text, x, y, font_size, color, layer)
 
-    def draw_text_centered_rect(self, text, rect_x, rect_y, rect_width, rect_height, font_size, color=(1, 1, 1, 1)):
+    def draw_text_centered_rect(self, text, rect_x, rect_y, rect_width, rect_height, font_size, color=(1, 1, 1, 1), layer=1):
         """Draw text centered within a rectangle"""
         text_width, text_height = self.get_text_dimensions(text, font_size)
         x = rect_x + (rect_width - text_width) // 2
         y = rect_y + (rect_height - text_height) // 2
-        return self.draw_text(text, x, y, font_size, color) 
\ No newline at end of file
+        return self.draw_text(text, x, y, font_size, color, layer) 
\ No newline at end of file
@@ -0,0 +1,34 @@
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed simulation ticks.
+
+    Each frame's wall-clock time goes into an accumulator and is paid out in
+    steps of `dt`. What is left over, as a fraction of a tick, is `alpha`:
+    how far the renderer should blend from the previous simulation state
+    toward the current one. After a long stall at most `max_ticks_per_frame`
+    ticks run and the rest of the backlog is dropped, so a slow frame can
+    never snowball into ever longer catch-up frames.
+    """
+    def __init__(self, tick_rate=60, max_ticks_per_frame=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.dropped_time = 0.0  # Seconds of simulation skipped by the cap
+
+    def advance(self, frame_time):
+        """Add one frame's elapsed time and return how many ticks to run"""
+        self.accumulator += frame_time
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks_per_frame:
+            self.dropped_time += (ticks - self.max_ticks_per_frame) * self.dt
+            ticks = self.max_ticks_per_frame
+            # Keep only the partial tick so the next frame starts fresh
+            self.accumulator %= self.dt
+        else:
+            self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        """Fraction of a tick elapsed since the last one, for interpolation"""
+        return min(self.accumulator / self.dt, 1.0)
@@ -0,0 +1,86 @@
+"""Opt-in span tracer writing Chrome Trace Event JSON.
+
+Wrap code in tracer.begin(name) / tracer.end(name) with constant string
+names. While the tracer is stopped both calls return straight away without
+allocating, so the calls can stay in hot paths. Once started, events go
+into preallocated arrays until write() saves them; the file opens in
+chrome://tracing or ui.perfetto.dev.
+"""
+import json
+import os
+import time
+import numpy as np
+
+class Tracer:
+    def __init__(self, capacity=1_000_000):
+        self.capacity = capacity  # Events kept per recording; later ones are dropped
+        self.enabled = False
+        self.count = 0
+        self.dropped = 0
+        self.names = []
+        self.name_ids = {}
+        self.timestamps = None
+        self.name_index = None
+        self.is_begin = None
+        self.origin = 0.0
+
+    def start(self):
+        """Begin a new recording, discarding any previous one"""
+        if self.timestamps is None:
+            self.timestamps = np.zeros(self.capacity)
+            self.name_index = np.zeros(self.capacity, dtype=np.int32)
+            self.is_begin = np.zeros(self.capacity, dtype=bool)
+        self.count = 0
+        self.dropped = 0
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def begin(self, name):
+        if not self.enabled:
+            return
+        self._record(name, True)
+
+    def end(self, name):
+        if not self.enabled:
+            return
+        self._record(name, False)
+
+    def _record(self, name, is_begin):
+        now = time.perf_counter()
+        if self.count == self.capacity:
+            self.dropped += 1
+            return
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        i = self.count
+        self.timestamps[i] = now - self.origin
+        self.name_index[i] = name_id
+        self.is_begin[i] = is_begin
+        self.count += 1
+
+    def write(self, path):
+        """Save the recorded spans as Chrome Trace Event JSON"""
+        n = self.count
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": 1, "args": {"name": "main"}}]
+        microseconds = (self.timestamps[:n] * 1e6).tolist() if n else []
+        for ts, name_id, is_begin in zip(microseconds, self.name_index[:n].tolist(), self.is_begin[:n].tolist()):
+            events.append({"name": self.names[name_id], "ph": "B" if is_begin else "E",
+                           "ts": ts, "pid": pid, "tid": 1})
+        try:
+            with open(path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+            message = f"Trace of {n} events written to {path}"
+            if self.dropped:
+                message += f" ({self.dropped} dropped after the buffer filled)"
+            print(message)
+        except OSError as e:
+            print(f"Failed to write trace to {path}: {str(e)}")
+
+# Shared by every module so spans nest on one timeline
+tracer = Tracer()